@@ -8,7 +8,6 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import AccessToken
-from mail_templated import EmailMessage
 from .serializers import (
     RegistrationSerializer,
     CustomAuthTokenSerializer,
@@ -19,7 +18,10 @@ from .serializers import (
     PasswordResetDoneSerializer,
 )
 from .permissions import NotAuthenticated
-from accounts.utils import EmailThreading
+from core.throttling import TokenBucketThrottle
+from accounts.emails import render_email
+from accounts.utils import queue_email
+from accounts.cache import invalidate_credentials
 from django.conf import settings
 import jwt
 
@@ -31,8 +33,11 @@ class RegistrationCreateApiView(CreateAPIView):
     register a new user (signup)
     """
 
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "registration"
     permission_classes = [NotAuthenticated]
     serializer_class = RegistrationSerializer
+    query_budget = 5
 
     def post(self, request, *args, **kwargs):
         """
@@ -45,13 +50,13 @@ class RegistrationCreateApiView(CreateAPIView):
         data = {"email": email}
         user = User.objects.get(email=email)
         token = self.get_token_for_user(user)
-        message = EmailMessage(
+        message = render_email(
             "email/verification_mail.tpl",
             {"token": token},
             "noreply@example.com",
             to=[email],
         )
-        EmailThreading(message).start()
+        queue_email(message)
         return Response(data, status=status.HTTP_201_CREATED)
 
     def get_token_for_user(self, user):
@@ -64,8 +69,11 @@ class CustomAuthTokenView(ObtainAuthToken):
     Custom Login with Token Authentication
     """
 
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "token-login"
     serializer_class = CustomAuthTokenSerializer
     permission_classes = [NotAuthenticated]
+    query_budget = 4
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(
@@ -85,6 +93,7 @@ class CustomDiscardTokenView(APIView):
     """
 
     permission_classes = [IsAuthenticated]
+    query_budget = 4
 
     def post(self, request):
         request.user.auth_token.delete()
@@ -99,6 +108,7 @@ class ChangePasswordAPIView(GenericAPIView):
 
     permission_classes = [IsAuthenticated]
     serializer_class = ChangePasswordSerializer
+    query_budget = 4
     model = User
 
     def get_object(self, queryset=None):
@@ -121,6 +131,7 @@ class ChangePasswordAPIView(GenericAPIView):
                 )
             self.object.set_password(serializer.data.get("new_password"))
             self.object.save()
+            invalidate_credentials(self.object.email, old_password)
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         return Response(
@@ -133,7 +144,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     getting refresh and access token with user_id and email
     """
 
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "jwt-create"
     serializer_class = CustomTokenObtainPairSerializer
+    query_budget = 3
 
 
 class EmailVerificationAPIView(APIView):
@@ -141,6 +155,8 @@ class EmailVerificationAPIView(APIView):
     View to send email verification to user
     """
 
+    query_budget = 3
+
     def get(self, request, token, *args, **kwargs):
         try:
             payload = jwt.decode(
@@ -173,20 +189,21 @@ class EmailResendAPIView(GenericAPIView):
 
     serializer_class = EmailResendSerializer
     permission_classes = [NotAuthenticated]
+    query_budget = 3
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data.get("user")
         token = AccessToken.for_user(user)
-        message = EmailMessage(
+        message = render_email(
             "email/verification_mail.tpl",
             {"token": token},
             "noreply@example.com",
             to=[user.email],
         )
 
-        EmailThreading(message).start()
+        queue_email(message)
         return Response(
             {
                 "Detail": "Email for activating your account sent successfully"
@@ -200,7 +217,10 @@ class PasswordResetSendAPIView(GenericAPIView):
     class that send reset password email with token for user
     """
 
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "password-reset"
     serializer_class = PasswordResetSendSerializer
+    query_budget = 3
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -212,14 +232,14 @@ class PasswordResetSendAPIView(GenericAPIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
         token = AccessToken.for_user(user)
-        message = EmailMessage(
+        message = render_email(
             "email/reset_password.tpl",
             {"token": token},
             "noreply@example.com",
             to=[user.email],
         )
 
-        EmailThreading(message).start()
+        queue_email(message)
         return Response(
             {"detail": "Email for reset password sent successfully"},
             status=status.HTTP_200_OK,
@@ -232,6 +252,7 @@ class PasswordResetDoneAPIView(GenericAPIView):
     """
 
     serializer_class = PasswordResetDoneSerializer
+    query_budget = 3
     model = User
 
     def put(self, request, token, *args, **kwargs):
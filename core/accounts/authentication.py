@@ -0,0 +1,91 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BasicAuthentication,
+    TokenAuthentication,
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from accounts.cache import (
+    cache_credentials,
+    cache_token,
+    cache_user,
+    check_password_fingerprint,
+    get_cached_credentials,
+    get_cached_token,
+    get_cached_user,
+)
+from accounts.models import User
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication getting the user of the token from the cache
+    (AUTH_CACHE_TIMEOUT seconds), saving the user drops it from the cache
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        user = user_id is not None and get_cached_user(user_id)
+        if not user:
+            user = super().get_user(validated_token)
+            cache_user(user)
+        elif not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication getting the token and its user from the cache
+    (AUTH_CACHE_TIMEOUT seconds), deleting the token or saving the user
+    drops them from the cache
+    """
+
+    def authenticate_credentials(self, key):
+        token = get_cached_token(key)
+        user = token and get_cached_user(token.user_id)
+        if not user:
+            user, token = super().authenticate_credentials(key)
+            cache_token(token)
+            cache_user(user)
+            return user, token
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        token.user = user
+        return user, token
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    BasicAuthentication remembering credentials it verified for
+    AUTH_BASIC_CACHE_TIMEOUT seconds (a keyed hmac of them), the password
+    hasher only runs again once they expire or the password changes
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        cached = get_cached_credentials(userid, password)
+        if cached:
+            user_id, fingerprint = cached
+            user = get_cached_user(user_id)
+            if not user:
+                user = User.objects.filter(pk=user_id).first()
+                if user:
+                    cache_user(user)
+            if (
+                user
+                and user.is_active
+                and check_password_fingerprint(user, fingerprint)
+            ):
+                return user, None
+        user, auth = super().authenticate_credentials(
+            userid, password, request
+        )
+        cache_credentials(userid, password, user)
+        cache_user(user)
+        return user, auth
@@ -0,0 +1,145 @@
+import copy
+from hashlib import sha256
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+USER_KEY = "accounts:auth:user:{}"
+TOKEN_KEY = "accounts:auth:token:{}"
+BASIC_KEY = "accounts:auth:basic:{}"
+# the fields of the cached users, the password hash is never cached
+USER_FIELDS = ("id", "email", "is_active", "is_verified", "is_staff")
+
+
+def _token_key(key):
+    # the token itself is a credential, it is not used as a cache key
+    return TOKEN_KEY.format(sha256(key.encode()).hexdigest())
+
+
+def get_cached_user(user_id):
+    """
+    the user cached by the authentication classes, None if not cached.
+    Only USER_FIELDS are cached, the other fields (password, last_login,
+    ...) are deferred and save() only writes the cached ones.
+    """
+    if not settings.AUTH_CACHE_TIMEOUT:
+        return None
+    cached = cache.get(USER_KEY.format(user_id))
+    if cached is None:
+        return None
+    fields, fingerprint = cached
+    model = get_user_model()
+    # from_db takes the values in the order of the model fields
+    names = [
+        field.attname
+        for field in model._meta.concrete_fields
+        if field.attname in fields
+    ]
+    user = model.from_db(
+        DEFAULT_DB_ALIAS, names, [fields[name] for name in names]
+    )
+    user._password_fingerprint = fingerprint
+    return user
+
+
+def cache_user(user):
+    if not settings.AUTH_CACHE_TIMEOUT:
+        return
+    fields = {name: getattr(user, name) for name in USER_FIELDS}
+    cache.set(
+        USER_KEY.format(user.pk),
+        (fields, password_fingerprint(user)),
+        timeout=settings.AUTH_CACHE_TIMEOUT,
+    )
+
+
+def get_cached_token(key):
+    """
+    the authtoken Token of key (without its user), None if not cached
+    """
+    if not settings.AUTH_CACHE_TIMEOUT:
+        return None
+    return cache.get(_token_key(key))
+
+
+def cache_token(token):
+    if not settings.AUTH_CACHE_TIMEOUT:
+        return
+    token = copy.copy(token)
+    token._state = copy.copy(token._state)
+    token._state.fields_cache = {}
+    cache.set(
+        _token_key(token.key), token, timeout=settings.AUTH_CACHE_TIMEOUT
+    )
+
+
+def _credentials_key(userid, password):
+    # a keyed hmac, neither the password nor a plain hash of it is stored
+    return BASIC_KEY.format(
+        salted_hmac(
+            "accounts.basic-auth", f"{userid}\0{password}", algorithm="sha256"
+        ).hexdigest()
+    )
+
+
+def password_fingerprint(user):
+    """
+    a keyed hmac of the password hash of user, kept with the cached user
+    to notice password changes without caching the hash
+    """
+    if "password" not in user.__dict__:
+        # a cached user, not loading the deferred hash
+        return user._password_fingerprint
+    return salted_hmac(
+        "accounts.basic-auth.password", user.password, algorithm="sha256"
+    ).hexdigest()
+
+
+def get_cached_credentials(userid, password):
+    """
+    (user id, password fingerprint) of basic credentials verified in the
+    last AUTH_BASIC_CACHE_TIMEOUT seconds, None if not cached
+    """
+    if not settings.AUTH_BASIC_CACHE_TIMEOUT:
+        return None
+    return cache.get(_credentials_key(userid, password))
+
+
+def cache_credentials(userid, password, user):
+    if not settings.AUTH_BASIC_CACHE_TIMEOUT:
+        return
+    cache.set(
+        _credentials_key(userid, password),
+        (user.pk, password_fingerprint(user)),
+        timeout=settings.AUTH_BASIC_CACHE_TIMEOUT,
+    )
+
+
+def check_password_fingerprint(user, fingerprint):
+    """
+    False once the password of user changed since it was cached
+    """
+    return constant_time_compare(password_fingerprint(user), fingerprint)
+
+
+def invalidate_credentials(userid, password):
+    cache.delete(_credentials_key(userid, password))
+
+
+def invalidate_user(user_id):
+    """
+    dropping the cached user once the current transaction commits
+    """
+    key = USER_KEY.format(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_token(key):
+    """
+    dropping the cached token once the current transaction commits
+    """
+    key = _token_key(key)
+    transaction.on_commit(lambda: cache.delete(key))
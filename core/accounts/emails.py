@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context
+from django.template.loader import get_template
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY,
+    BlockContext,
+    BlockNode,
+    ExtendsNode,
+)
+
+_templates = {}
+
+
+class EmailTemplate:
+    """
+    A mail_templated template (subject, body and html blocks) compiled
+    once: the extends chain is resolved when loading and each block is
+    rendered on its own, without rendering the whole template and
+    searching the result for the block markers as mail_templated does.
+    """
+
+    block_names = ("subject", "body", "html")
+
+    def __init__(self, template_name):
+        template = get_template(template_name).template
+        self.template = template
+        # the blocks of each template of the chain, child first
+        self.chain = []
+        while True:
+            self.chain.append(
+                {
+                    node.name: node
+                    for node in template.nodelist.get_nodes_by_type(BlockNode)
+                }
+            )
+            extends = template.nodelist.get_nodes_by_type(ExtendsNode)
+            if not extends:
+                break
+            parent_name = extends[0].parent_name.resolve(Context())
+            template = get_template(parent_name).template
+        # rendering the root blocks renders the overriding ones
+        self.blocks = [
+            (name, self.chain[-1].get(name)) for name in self.block_names
+        ]
+
+    def render_blocks(self, context):
+        result = {}
+        for name, node in self.blocks:
+            if node is None:
+                result[name] = ""
+                continue
+            block_context = BlockContext()
+            for blocks in self.chain:
+                block_context.add_blocks(blocks)
+            context.render_context[BLOCK_CONTEXT_KEY] = block_context
+            result[name] = node.render(context).strip("\n\r")
+        return result
+
+    def render(self, context):
+        """
+        the rendered subject, body and html of context
+        """
+        return next(self.render_batch([context]))
+
+    def render_batch(self, contexts):
+        """
+        rendering each context of contexts with a single template context,
+        yields the rendered subject, body and html of each one
+        """
+        context = Context()
+        with context.bind_template(self.template):
+            for data in contexts:
+                # a fresh render state ({% cycle %}, {% ifchanged %}) per
+                # context, as when rendered alone
+                with context.render_context.push_state(self.template):
+                    with context.push(data):
+                        yield self.render_blocks(context)
+
+    def make_message(self, rendered, from_email, to):
+        # the same message mail_templated builds
+        message = EmailMultiAlternatives(
+            rendered["subject"], rendered["body"], from_email, to
+        )
+        if rendered["html"] and rendered["body"]:
+            message.attach_alternative(rendered["html"], "text/html")
+        elif rendered["html"]:
+            message.body = rendered["html"]
+            message.content_subtype = "html"
+        return message
+
+
+def get_email_template(template_name):
+    """
+    the EmailTemplate of template_name, compiled once per process
+    (on each call with DEBUG, to see the changes of the templates)
+    """
+    if settings.DEBUG:
+        return EmailTemplate(template_name)
+    template = _templates.get(template_name)
+    if template is None:
+        template = _templates[template_name] = EmailTemplate(template_name)
+    return template
+
+
+def render_email(template_name, context, from_email, to):
+    """
+    Rendering template_name into an EmailMultiAlternatives
+    """
+    template = get_email_template(template_name)
+    return template.make_message(template.render(context), from_email, to)
+
+
+def render_emails(template_name, recipients, from_email):
+    """
+    Rendering template_name for many recipients in one pass (bulk sends),
+    recipients is an iterable of (to, context)
+    """
+    template = get_email_template(template_name)
+    recipients = list(recipients)
+    rendered = template.render_batch(context for _, context in recipients)
+    return [
+        template.make_message(result, from_email, to)
+        for (to, _), result in zip(recipients, rendered)
+    ]
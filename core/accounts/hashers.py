@@ -0,0 +1,56 @@
+import atexit
+import base64
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.crypto import pbkdf2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """
+    the process pool of PASSWORD_HASH_WORKERS processes, None when off
+    """
+    global _executor
+    if not settings.PASSWORD_HASH_WORKERS:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                # not forking the threads and connections of the web worker
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_executor.shutdown)
+    return _executor
+
+
+class OffloadedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2PasswordHasher (the same pbkdf2_sha256 hashes, it replaces the
+    stock one in PASSWORD_HASHERS) computing the hashes in a pool of
+    PASSWORD_HASH_WORKERS processes, for set_password, check_password and
+    authenticate. In the worker when it is 0.
+
+    The request still waits for the hash: a sync worker is busy as long
+    as before, only the cpu moves out of it. pbkdf2_hmac releases the
+    GIL, so threaded workers gain nothing either; the pool is for gevent
+    workers, where the hash would block every greenlet of the worker,
+    and for capping the cpu hashing takes from the web workers.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        executor = get_hash_executor()
+        if executor is None:
+            return super().encode(password, salt, iterations)
+        assert password is not None
+        assert salt and "$" not in salt
+        iterations = iterations or self.iterations
+        hash = executor.submit(pbkdf2, password, salt, iterations).result()
+        hash = base64.b64encode(hash).decode("ascii").strip()
+        return "%s$%d$%s$%s" % (self.algorithm, iterations, salt, hash)
@@ -1,11 +1,17 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
-from django.db.models.signals import post_save
+from django.core.mail import EmailMultiAlternatives
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from rest_framework.authtoken.models import Token
 
 
 from accounts.managers import CustomUserManager
+from accounts.cache import invalidate_user, invalidate_token
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -40,3 +46,135 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
     """
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    a signal to drop the user from the authentication cache when it
+    changes (password, is_active, is_verified, ...)
+    """
+    invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    a signal to drop a deleted (discarded) token from the authentication
+    cache
+    """
+    invalidate_token(instance.key)
+
+
+class OutboundEmailQuerySet(models.QuerySet):
+    def enqueue(self, message):
+        """
+        Saving an EmailMessage to the outbound queue, mail_templated
+        messages are rendered here so the worker only sends
+        """
+        if hasattr(message, "render") and not message.is_rendered:
+            message.render()
+        body = message.body
+        html = next(
+            (
+                content
+                for content, mimetype in getattr(message, "alternatives", [])
+                if mimetype == "text/html"
+            ),
+            "",
+        )
+        if message.content_subtype == "html":
+            body, html = "", body
+        return self.create(
+            subject=message.subject,
+            body=body,
+            html=html,
+            from_email=message.from_email,
+            to=list(message.to),
+        )
+
+    def claim(self, batch_size, stale_after):
+        """
+        Marking up to batch_size pending emails that are due as sending,
+        other workers skip them, returns the claimed emails.
+        Emails left sending for stale_after seconds (a worker died) are
+        claimed again.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            ids = list(
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    Q(
+                        status=OutboundEmail.Status.PENDING,
+                        next_attempt_date__lte=now,
+                    )
+                    | Q(
+                        status=OutboundEmail.Status.SENDING,
+                        next_attempt_date__lte=now
+                        - timedelta(seconds=stale_after),
+                    )
+                )
+                .order_by("next_attempt_date", "id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            self.filter(id__in=ids).update(
+                status=OutboundEmail.Status.SENDING, next_attempt_date=now
+            )
+        return list(self.filter(id__in=ids).order_by("id"))
+
+
+class OutboundEmail(models.Model):
+    """
+    an email waiting to be sent (or sent) by the send_outbound_emails task
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        SENDING = "sending"
+        SENT = "sent"
+        FAILED = "failed"
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+    next_attempt_date = models.DateTimeField(default=timezone.now)
+    sent_date = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboundEmailQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_date"],
+                name="accounts_outbound_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return "{} - {} ({})".format(
+            ", ".join(self.to), self.subject, self.status
+        )
+
+    def to_message(self, connection=None):
+        message = EmailMultiAlternatives(
+            self.subject,
+            self.body or self.html,
+            self.from_email,
+            self.to,
+            connection=connection,
+        )
+        if not self.body:
+            message.content_subtype = "html"
+        elif self.html:
+            message.attach_alternative(self.html, "text/html")
+        return message
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from time import monotonic
+
+from celery import Celery
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import OutboundEmail
+
+
+app = Celery()
+logger = get_task_logger(__name__)
+
+
+@app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    # picking up the retries and emails whose enqueued task was lost
+    sender.add_periodic_task(60.0, send_outbound_emails.s())
+
+
+def retry_later(email, exc):
+    """
+    scheduling the email again with an exponential backoff, it fails
+    for good after EMAIL_QUEUE_MAX_ATTEMPTS
+    """
+    email.attempts += 1
+    email.last_error = repr(exc)
+    if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.FAILED
+        logger.error("email %s failed: %r", email.pk, exc)
+    else:
+        email.status = OutboundEmail.Status.PENDING
+        email.next_attempt_date = timezone.now() + timedelta(
+            seconds=settings.EMAIL_QUEUE_RETRY_DELAY
+            * 2 ** (email.attempts - 1)
+        )
+    email.save(
+        update_fields=["attempts", "last_error", "status", "next_attempt_date"]
+    )
+
+
+def reconnect(connection):
+    """
+    the smtp backend keeps a dropped connection as open (open() does
+    nothing), closing it and opening a new one for the next emails
+    """
+    connection.close()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("can not reconnect to the mail server: %r", exc)
+
+
+def send_batch(emails, connection):
+    """
+    sending the claimed emails over one open connection, one
+    send_messages call per email to know which of them failed,
+    returns the number of sent emails
+    """
+    sent = []
+    for email in emails:
+        try:
+            connection.send_messages([email.to_message()])
+        except Exception as exc:
+            retry_later(email, exc)
+            if isinstance(exc, SMTPException):
+                reconnect(connection)
+        else:
+            sent.append(email.pk)
+    OutboundEmail.objects.filter(id__in=sent).update(
+        status=OutboundEmail.Status.SENT,
+        sent_date=timezone.now(),
+        attempts=F("attempts") + 1,
+        last_error="",
+    )
+    return len(sent)
+
+
+@app.task
+def send_outbound_emails(batch_size=None, time_budget=None):
+    """
+    draining the outbound email queue in batches over one reused SMTP
+    connection within a time budget, returns the number of sent emails
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    deadline = monotonic() + (time_budget or settings.EMAIL_QUEUE_TIME_BUDGET)
+    connection = get_connection()
+    total = 0
+    try:
+        while monotonic() < deadline:
+            emails = OutboundEmail.objects.claim(
+                batch_size, settings.EMAIL_QUEUE_STALE_AFTER
+            )
+            if not emails:
+                break
+            try:
+                # a no-op once the connection is open
+                connection.open()
+            except Exception as exc:
+                logger.warning("can not connect to the mail server: %r", exc)
+                for email in emails:
+                    retry_later(email, exc)
+                break
+            total += send_batch(emails, connection)
+    finally:
+        connection.close()
+    if total:
+        logger.info("sent %s emails", total)
+    return total
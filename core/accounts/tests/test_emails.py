@@ -0,0 +1,88 @@
+import pytest
+from django.template import TemplateDoesNotExist
+from mail_templated import EmailMessage
+
+from accounts.emails import get_email_template, render_email, render_emails
+from accounts.models import OutboundEmail
+
+
+@pytest.mark.parametrize(
+    "template_name",
+    ["email/verification_mail.tpl", "email/reset_password.tpl"],
+)
+def test_render_email_same_as_mail_templated(template_name):
+    context = {"token": "a<b"}
+    expected = EmailMessage(
+        template_name, context, "noreply@example.com", to=["a@test.com"]
+    )
+    expected.render()
+    message = render_email(
+        template_name, context, "noreply@example.com", to=["a@test.com"]
+    )
+    assert message.subject == expected.subject
+    assert message.body == expected.body
+    assert message.content_subtype == expected.content_subtype
+    assert message.alternatives == expected.alternatives
+    assert "a&lt;b" in message.body
+
+
+def test_render_emails_batch():
+    messages = render_emails(
+        "email/verification_mail.tpl",
+        [([f"user{i}@test.com"], {"token": f"token{i}"}) for i in range(3)],
+        "noreply@example.com",
+    )
+    assert [message.to for message in messages] == [
+        [f"user{i}@test.com"] for i in range(3)
+    ]
+    for i, message in enumerate(messages):
+        assert f"/token{i}/" in message.body
+
+
+def test_render_batch_state_per_context(settings):
+    settings.TEMPLATES = [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "OPTIONS": {
+                "loaders": [
+                    (
+                        "django.template.loaders.locmem.Loader",
+                        {
+                            "email/state.tpl": (
+                                "{% block subject %}{% ifchanged %}Hi"
+                                "{% endifchanged %} {{ name }}{% endblock %}"
+                                "{% block body %}{% cycle 'a' 'b' %}"
+                                "{% endblock %}"
+                            )
+                        },
+                    )
+                ]
+            },
+        }
+    ]
+    template = get_email_template("email/state.tpl")
+    rendered = list(template.render_batch([{"name": "x"}, {"name": "y"}]))
+    assert rendered == [
+        {"subject": "Hi x", "body": "a", "html": ""},
+        {"subject": "Hi y", "body": "a", "html": ""},
+    ]
+
+
+def test_email_template_compiled_once():
+    template = get_email_template("email/verification_mail.tpl")
+    assert get_email_template("email/verification_mail.tpl") is template
+    with pytest.raises(TemplateDoesNotExist):
+        get_email_template("email/missing.tpl")
+
+
+@pytest.mark.django_db
+def test_queued_html_email_keeps_its_subtype():
+    message = render_email(
+        "email/verification_mail.tpl",
+        {"token": "token"},
+        "noreply@example.com",
+        to=["a@test.com"],
+    )
+    queued = OutboundEmail.objects.enqueue(message).to_message()
+    assert queued.content_subtype == "html"
+    assert queued.body == message.body
@@ -0,0 +1,58 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    identify_hasher,
+    make_password,
+)
+
+from accounts.hashers import OffloadedPBKDF2PasswordHasher, get_hash_executor
+
+
+def test_offloaded_hasher_same_hashes(settings):
+    settings.PASSWORD_HASH_WORKERS = 1
+    hasher = OffloadedPBKDF2PasswordHasher()
+    encoded = hasher.encode("a/1234567", "salt", iterations=1000)
+    assert encoded == PBKDF2PasswordHasher().encode(
+        "a/1234567", "salt", iterations=1000
+    )
+    assert hasher.verify("a/1234567", encoded)
+    assert not hasher.verify("wrong", encoded)
+
+
+def test_check_password_goes_through_the_pool(settings):
+    settings.PASSWORD_HASH_WORKERS = 1
+    encoded = make_password("a/1234567")
+    assert isinstance(identify_hasher(encoded), OffloadedPBKDF2PasswordHasher)
+    executor = get_hash_executor()
+    with mock.patch.object(
+        executor, "submit", wraps=executor.submit
+    ) as submit:
+        assert check_password("a/1234567", encoded)
+        assert not check_password("wrong", encoded)
+    assert submit.call_count == 2
+
+
+def test_one_pool_for_concurrent_requests(settings, monkeypatch):
+    settings.PASSWORD_HASH_WORKERS = 1
+    monkeypatch.setattr("accounts.hashers._executor", None)
+    start = threading.Barrier(8)
+    executors = []
+
+    def get():
+        start.wait()
+        executors.append(get_hash_executor())
+
+    with mock.patch("accounts.hashers.ProcessPoolExecutor") as pool:
+        # a slow start, as spawning the processes
+        pool.side_effect = lambda **kwargs: time.sleep(0.05) or mock.Mock()
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert pool.call_count == 1
+    assert len(set(map(id, executors))) == 1
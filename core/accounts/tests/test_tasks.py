@@ -0,0 +1,125 @@
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.smtp import EmailBackend
+from django.urls import reverse
+from mail_templated import EmailMessage
+from rest_framework.test import APIClient
+
+from accounts.models import OutboundEmail
+from accounts.tasks import send_outbound_emails
+
+
+@pytest.mark.django_db
+class TestOutboundEmails:
+    def enqueue(self, number=1):
+        return [
+            OutboundEmail.objects.enqueue(
+                EmailMessage(
+                    "email/verification_mail.tpl",
+                    {"token": "token"},
+                    "noreply@example.com",
+                    to=[f"user{i}@test.com"],
+                )
+            )
+            for i in range(number)
+        ]
+
+    def test_registration_queues_email(
+        self, django_capture_on_commit_callbacks
+    ):
+        with mock.patch("accounts.tasks.send_outbound_emails.delay") as m:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = APIClient().post(
+                    reverse("accounts:api-v1:registration"),
+                    data={
+                        "email": "test@test.com",
+                        "password": "a/1234567",
+                        "password1": "a/1234567",
+                    },
+                )
+        assert response.status_code == 201
+        assert m.called
+        email = OutboundEmail.objects.get()
+        assert email.to == ["test@test.com"]
+        assert email.status == OutboundEmail.Status.PENDING
+        assert len(mail.outbox) == 0
+
+    def test_send_outbound_emails_batches(self):
+        self.enqueue(5)
+        with mock.patch("accounts.tasks.get_connection") as get_connection:
+            get_connection.return_value = mail.get_connection()
+            assert send_outbound_emails(batch_size=2) == 5
+        assert get_connection.call_count == 1
+        assert len(mail.outbox) == 5
+        assert not OutboundEmail.objects.exclude(
+            status=OutboundEmail.Status.SENT
+        ).exists()
+
+    def test_failed_email_retried_with_backoff(self, settings):
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+        email, other = self.enqueue(2)
+        send_messages = mail.get_connection().send_messages
+
+        def fail_first(messages):
+            if messages[0].to == email.to:
+                raise SMTPServerDisconnected("gone")
+            return send_messages(messages)
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=fail_first,
+        ):
+            assert send_outbound_emails() == 1
+            email.refresh_from_db()
+            assert email.status == OutboundEmail.Status.PENDING
+            assert email.attempts == 1
+            assert "gone" in email.last_error
+            # not due yet
+            assert send_outbound_emails() == 0
+            OutboundEmail.objects.filter(pk=email.pk).update(
+                next_attempt_date=email.created_date
+            )
+            assert send_outbound_emails() == 0
+        email.refresh_from_db()
+        other.refresh_from_db()
+        assert email.status == OutboundEmail.Status.FAILED
+        assert other.status == OutboundEmail.Status.SENT
+
+    def test_dropped_connection_reopened(self, settings):
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        first, dropped, last = self.enqueue(3)
+        connections = []
+
+        class DroppingSMTP:
+            """
+            smtplib.SMTP stand-in, the first connection drops after an email
+            """
+
+            def __init__(self, *args, **kwargs):
+                self.sent = []
+                connections.append(self)
+
+            def sendmail(self, from_email, recipients, message):
+                if self is connections[0] and self.sent:
+                    raise SMTPServerDisconnected("dropped")
+                self.sent.extend(recipients)
+
+            def quit(self):
+                if self is connections[0] and self.sent:
+                    raise SMTPServerDisconnected("dropped")
+
+            def close(self):
+                pass
+
+        with mock.patch.object(EmailBackend, "connection_class", DroppingSMTP):
+            assert send_outbound_emails() == 2
+        assert [connection.sent for connection in connections] == [
+            first.to,
+            last.to,
+        ]
+        dropped.refresh_from_db()
+        assert dropped.status == OutboundEmail.Status.PENDING
+        assert dropped.attempts == 1
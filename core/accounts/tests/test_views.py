@@ -0,0 +1,26 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.urls import reverse
+
+from accounts.models import User
+
+
+@pytest.mark.django_db
+def test_signup_logs_in_hashing_once(client):
+    with mock.patch.object(
+        PBKDF2PasswordHasher, "encode", autospec=True, return_value="x"
+    ) as encode:
+        response = client.post(
+            reverse("signup"),
+            {
+                "email": "test@test.com",
+                "password1": "a/1234567",
+                "password2": "a/1234567",
+            },
+        )
+    assert response.status_code == 302
+    user = User.objects.get(email="test@test.com")
+    assert client.session["_auth_user_id"] == str(user.pk)
+    assert encode.call_count == 1
@@ -1,14 +1,15 @@
-import threading
+from django.db import transaction
 
+from accounts.models import OutboundEmail
 
-class EmailThreading(threading.Thread):
+
+def queue_email(message):
     """
-    sending email with thread
+    saving the email to the outbound queue and waking up a worker to send
+    it once the current transaction commits
     """
+    from accounts.tasks import send_outbound_emails
 
-    def __init__(self, email_object):
-        threading.Thread.__init__(self)
-        self.email_object = email_object
-
-    def run(self):
-        self.email_object.send()
+    email = OutboundEmail.objects.enqueue(message)
+    transaction.on_commit(send_outbound_emails.delay)
+    return email
@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 from accounts.forms import CustomUserCreationForm
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import login
 
 
 class SignupCreateView(CreateView):
@@ -14,11 +15,14 @@ class SignupCreateView(CreateView):
     template_name = "registration/signup.html"
 
     def form_valid(self, form):
-        """If the form is valid, save the associated model."""
-        self.object = form.save()
+        """
+        Saving the user and logging it in, the password was just hashed
+        by the form so it is not checked again with authenticate
+        """
         valid = super(SignupCreateView, self).form_valid(form)
-        email = self.request.POST["email"]
-        password = self.request.POST["password1"]
-        user = authenticate(self.request, email=email, password=password)
-        login(self.request, user)
+        login(
+            self.request,
+            self.object,
+            backend=settings.AUTHENTICATION_BACKENDS[0],
+        )
         return valid
@@ -0,0 +1,119 @@
+"""
+Latency and queries per request of the task api hot paths (list, detail,
+create, search, filter) and the throughput of TaskSerializer, on a dataset
+seeded by the create_task command.
+
+    pytest benchmarks/bench_api.py -s --bench-size 100k \
+        --bench-json results.json --bench-baseline baseline.json
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from todo.api.v1.serializers import TaskSerializer
+from todo.models import Task
+from .utils import measure
+
+USERS = 10
+PAGE_SIZE = 5
+SERIALIZED_TASKS = 100
+
+
+def seed_dataset(size):
+    """
+    seeding size tasks over USERS users, returns the first user
+    """
+    call_command(
+        "create_task",
+        number=size // USERS,
+        users=USERS,
+        days=365,
+        seed=0,
+        stdout=StringIO(),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return User.objects.order_by("id").first()
+
+
+def measure_request(send, expected_status=200):
+    """
+    queries of one request and the median latency of sending it
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = send()
+    assert response.status_code == expected_status
+    return {"queries": len(queries), "ms": measure(send)}
+
+
+@pytest.mark.django_db
+def test_bench_task_api(bench_results, bench_size, settings):
+    user = seed_dataset(bench_size)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    list_url = reverse("todo:api-v1:task-list")
+    task = Task.objects.filter(author=user).first()
+    detail_url = reverse("todo:api-v1:task-detail", kwargs={"pk": task.pk})
+    reads = {
+        "list": (list_url, {}),
+        "list cursor": (list_url, {"pagination": "cursor"}),
+        "filter": (list_url, {"is_done": "true"}),
+        "search": (list_url, {"search": "the"}),
+        "detail": (detail_url, {}),
+    }
+
+    result = {}
+    settings.TASK_CACHE_TIMEOUT = 0
+    for name, (url, params) in reads.items():
+        params = dict(params, page_size=PAGE_SIZE)
+        result[name] = measure_request(
+            lambda url=url, params=params: client.get(url, params)
+        )
+    result["create"] = measure_request(
+        lambda: client.post(list_url, {"content": "bench", "is_done": False}),
+        expected_status=201,
+    )
+
+    settings.TASK_CACHE_TIMEOUT = 300
+    for name in ["list", "detail"]:
+        url, params = reads[name]
+        params = dict(params, page_size=PAGE_SIZE)
+        client.get(url, params)  # filling the cache
+        result[f"{name} cached"] = measure_request(
+            lambda url=url, params=params: client.get(url, params)
+        )
+    bench_results["task_api"] = result
+
+
+@pytest.mark.django_db
+def test_bench_task_serializer(bench_results, bench_size):
+    user = seed_dataset(min(bench_size, 10_000))
+    request = Request(
+        APIRequestFactory().get(reverse("todo:api-v1:task-list")),
+        parser_context={"kwargs": {}},
+    )
+    tasks = list(
+        Task.objects.filter(author=user).select_related("author")[
+            :SERIALIZED_TASKS
+        ]
+    )
+
+    def serialize():
+        return TaskSerializer(
+            tasks, many=True, context={"request": request}
+        ).data
+
+    assert len(serialize()) == len(tasks)
+    ms = measure(serialize)
+    bench_results["task_serializer"] = {
+        "tasks": len(tasks),
+        "ms": ms,
+        "tasks_per_s": round(len(tasks) / ms * 1000),
+    }
@@ -0,0 +1,84 @@
+"""
+Queries and latency of authenticating one api request with the token
+and jwt authentication classes against their cached versions, and the
+queries saved per request. The basic authentication comparison reports
+the authentications per second of a single worker.
+
+    pytest benchmarks/bench_auth.py -s
+"""
+from base64 import b64encode
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import (
+    BasicAuthentication,
+    TokenAuthentication,
+)
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import (
+    CachedBasicAuthentication,
+    CachedJWTAuthentication,
+    CachedTokenAuthentication,
+)
+from accounts.models import User
+from .utils import measure
+
+
+def measure_authenticate(auth, header, repeat=200):
+    request = Request(
+        APIRequestFactory().get("/api/v1/task/", HTTP_AUTHORIZATION=header)
+    )
+    auth.authenticate(request)  # filling the cache of the cached classes
+    with CaptureQueriesContext(connection) as queries:
+        user, _ = auth.authenticate(request)
+    assert user.email == "bench@test.com"
+    return {
+        "queries": len(queries),
+        "ms": measure(lambda: auth.authenticate(request), repeat=repeat),
+    }
+
+
+@pytest.mark.django_db
+def test_bench_authentication(bench_results):
+    user = User.objects.create_user(
+        email="bench@test.com", password="a/1234567", is_verified=True
+    )
+    headers = {
+        "token": f"Token {user.auth_token.key}",
+        "jwt": f"Bearer {AccessToken.for_user(user)}",
+    }
+    result = {}
+    for name, plain, cached in [
+        ("token", TokenAuthentication(), CachedTokenAuthentication()),
+        ("jwt", JWTAuthentication(), CachedJWTAuthentication()),
+    ]:
+        result[name] = {
+            "plain": measure_authenticate(plain, headers[name]),
+            "cached": measure_authenticate(cached, headers[name]),
+        }
+        result[name]["queries_saved"] = (
+            result[name]["plain"]["queries"]
+            - result[name]["cached"]["queries"]
+        )
+    bench_results["authentication"] = result
+
+
+@pytest.mark.django_db
+def test_bench_basic_authentication(bench_results):
+    User.objects.create_user(
+        email="bench@test.com", password="a/1234567", is_verified=True
+    )
+    header = "Basic " + b64encode(b"bench@test.com:a/1234567").decode()
+    result = {}
+    for name, auth, repeat in [
+        ("plain", BasicAuthentication(), 10),
+        ("cached", CachedBasicAuthentication(), 200),
+    ]:
+        result[name] = measure_authenticate(auth, header, repeat=repeat)
+        result[name]["per_s"] = round(1000 / result[name]["ms"])
+    bench_results["basic_authentication"] = result
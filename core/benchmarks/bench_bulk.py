@@ -0,0 +1,73 @@
+"""
+Throughput of the bulk task endpoints against one request per task.
+
+    pytest benchmarks/bench_bulk.py -s
+"""
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from todo.models import Task
+from .utils import measure
+
+ITEMS = 100
+
+
+def tasks_per_second(ms):
+    return round(ITEMS / ms * 1000, 1)
+
+
+@pytest.mark.django_db
+def test_bench_task_bulk_endpoints(bench_results):
+    user = User.objects.create_user(
+        email="bulk@test.com", password="a", is_verified=True
+    )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    endpoint = reverse("todo:api-v1:task-list")
+    bulk_endpoint = reverse("todo:api-v1:task-bulk")
+    payload = [{"content": f"task {i}"} for i in range(ITEMS)]
+
+    def create_one_by_one():
+        for item in payload:
+            client.post(endpoint, item, format="json")
+
+    def create_bulk():
+        client.post(bulk_endpoint, payload, format="json")
+
+    def update_one_by_one():
+        for pk in Task.objects.values_list("id", flat=True)[:ITEMS]:
+            client.patch(f"{endpoint}{pk}/", {"is_done": True}, format="json")
+
+    def update_bulk():
+        ids = Task.objects.values_list("id", flat=True)[:ITEMS]
+        data = [{"id": pk, "is_done": True} for pk in ids]
+        client.patch(bulk_endpoint, data, format="json")
+
+    def delete_one_by_one():
+        create_bulk()
+        for pk in Task.objects.values_list("id", flat=True)[:ITEMS]:
+            client.delete(f"{endpoint}{pk}/")
+
+    def delete_bulk():
+        create_bulk()
+        ids = list(Task.objects.values_list("id", flat=True)[:ITEMS])
+        client.delete(bulk_endpoint, ids, format="json")
+
+    result = {}
+    for name, one_by_one, bulk in [
+        ("create", create_one_by_one, create_bulk),
+        ("update", update_one_by_one, update_bulk),
+        ("delete", delete_one_by_one, delete_bulk),
+    ]:
+        result[name] = {
+            "one_by_one_tasks_per_s": tasks_per_second(
+                measure(one_by_one, repeat=3, warmup=1)
+            ),
+            "bulk_tasks_per_s": tasks_per_second(
+                measure(bulk, repeat=3, warmup=1)
+            ),
+        }
+    # delete timings include the bulk create of the tasks to delete
+    bench_results["task_bulk_endpoints"] = {"items": ITEMS, **result}
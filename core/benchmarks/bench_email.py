@@ -0,0 +1,124 @@
+"""
+Load test of the outbound email pipeline against a local SMTP stand-in:
+a thread and a connection per email (the old EmailThreading) against
+send_outbound_emails draining the queue over one connection.
+
+    BENCH_EMAILS=1000 pytest benchmarks/bench_email.py -s
+"""
+import os
+import socketserver
+import threading
+import time
+
+import pytest
+from django.core.mail import EmailMessage
+
+from accounts.models import OutboundEmail
+from accounts.tasks import send_outbound_emails
+
+EMAILS = int(os.environ.get("BENCH_EMAILS", 200))
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    just enough SMTP to accept messages, counting connections and emails
+    """
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost stand-in")
+        for line in self.rfile:
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 end with .")
+                for data in self.rfile:
+                    if data in (b".\r\n", b".\n"):
+                        break
+                with self.server.lock:
+                    self.server.messages += 1
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = self.messages = 0
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = SMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_message(number):
+    return EmailMessage(
+        "Account verification",
+        "token",
+        "noreply@example.com",
+        to=[f"user{number}@test.com"],
+    )
+
+
+def wait_for(server, messages, timeout=60):
+    deadline = time.monotonic() + timeout
+    while server.messages < messages and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert server.messages == messages
+
+
+@pytest.mark.django_db
+def test_bench_email_pipeline(bench_results, smtp_server):
+    result = {"emails": EMAILS}
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=make_message(i).send) for i in range(EMAILS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wait_for(smtp_server, EMAILS)
+    seconds = time.perf_counter() - start
+    result["thread_per_email"] = {
+        "connections": smtp_server.connections,
+        "ms": round(seconds * 1000, 3),
+        "per_s": round(EMAILS / seconds),
+    }
+
+    smtp_server.connections = smtp_server.messages = 0
+    start = time.perf_counter()
+    for i in range(EMAILS):
+        OutboundEmail.objects.enqueue(make_message(i))
+    enqueue_seconds = time.perf_counter() - start
+    assert send_outbound_emails() == EMAILS
+    wait_for(smtp_server, EMAILS)
+    seconds = time.perf_counter() - start
+    result["queue"] = {
+        "connections": smtp_server.connections,
+        "enqueue_ms": round(enqueue_seconds * 1000 / EMAILS, 3),
+        "ms": round(seconds * 1000, 3),
+        "per_s": round(EMAILS / seconds),
+    }
+    bench_results["email_pipeline"] = result
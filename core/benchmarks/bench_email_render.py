@@ -0,0 +1,45 @@
+"""
+Verification emails rendered per second with mail_templated, with the
+compiled accounts.emails templates and with their batch rendering.
+
+    BENCH_EMAILS=5000 pytest benchmarks/bench_email_render.py -s
+"""
+import os
+
+from mail_templated import EmailMessage
+
+from accounts.emails import render_email, render_emails
+from .utils import measure
+
+EMAILS = int(os.environ.get("BENCH_EMAILS", 500))
+TEMPLATE = "email/verification_mail.tpl"
+
+
+def test_bench_email_render(bench_results, settings):
+    settings.DEBUG = False
+    recipients = [
+        ([f"user{i}@test.com"], {"token": f"token{i}"}) for i in range(EMAILS)
+    ]
+
+    def mail_templated():
+        for to, context in recipients:
+            EmailMessage(
+                TEMPLATE, context, "noreply@example.com", to=to
+            ).render()
+
+    def compiled():
+        for to, context in recipients:
+            render_email(TEMPLATE, context, "noreply@example.com", to)
+
+    def batch():
+        render_emails(TEMPLATE, recipients, "noreply@example.com")
+
+    result = {"emails": EMAILS}
+    for name, render in [
+        ("mail_templated", mail_templated),
+        ("compiled", compiled),
+        ("batch", batch),
+    ]:
+        ms = measure(render, repeat=5, warmup=1)
+        result[name] = {"ms": ms, "per_s": round(EMAILS / ms * 1000)}
+    bench_results["email_render"] = result
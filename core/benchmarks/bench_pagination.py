@@ -0,0 +1,61 @@
+"""
+Page number pagination against cursor (keyset) pagination of the task api,
+for the first page and page 1000.
+
+    pytest benchmarks/bench_pagination.py -s
+"""
+import os
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from todo.models import Task
+from todo.utils import encode_cursor
+from .utils import measure, seed_tasks
+
+HEAVY_USER_TASKS = int(os.environ.get("BENCH_TASKS", 20000))
+PAGE_SIZE = 5
+DEEP_PAGE = 1000
+
+
+@pytest.mark.django_db
+def test_bench_task_pagination(bench_results):
+    user = User.objects.create_user(
+        email="heavy@test.com", password="a", is_verified=True
+    )
+    seed_tasks(user, HEAVY_USER_TASKS)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE todo_task")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    endpoint = reverse("todo:api-v1:task-list")
+
+    # the cursor a client walking to page 1000 would hold
+    last_of_previous_page = Task.objects.filter(author=user).order_by(
+        "-created_date", "-id"
+    )[(DEEP_PAGE - 1) * PAGE_SIZE - 1]
+    requests = {
+        "page first": {"page": 1},
+        f"page {DEEP_PAGE}": {"page": DEEP_PAGE},
+        "cursor first": {"pagination": "cursor"},
+        f"cursor {DEEP_PAGE}": {
+            "cursor": encode_cursor(last_of_previous_page)
+        },
+    }
+
+    result = {}
+    for name, params in requests.items():
+        params["page_size"] = PAGE_SIZE
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(endpoint, params)
+        assert response.status_code == 200
+        assert len(response.data["results"]) == PAGE_SIZE
+        result[name] = {
+            "queries": len(queries),
+            "ms": measure(lambda params=params: client.get(endpoint, params)),
+        }
+    bench_results["task_pagination"] = result
@@ -0,0 +1,50 @@
+"""
+Rendering TaskSerializer pages with DRF's JSONRenderer against
+FastJSONRenderer (orjson), and parsing a bulk payload.
+
+    pytest benchmarks/bench_renderer.py -s
+"""
+import io
+import json
+import os
+
+import pytest
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from core.renderers import FastJSONParser, FastJSONRenderer
+from todo.api.v1.serializers import TaskSerializer
+from todo.models import Task
+from .utils import measure, seed_tasks
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1000))
+
+
+@pytest.mark.django_db
+def test_bench_task_renderer(bench_results):
+    user = User.objects.create_user(email="heavy@test.com", password="a")
+    seed_tasks(user, ROWS)
+    tasks = Task.objects.filter(author=user).select_related("author")
+    request = Request(
+        APIRequestFactory().get("/api/v1/task/"),
+        parser_context={"kwargs": {}},
+    )
+    data = TaskSerializer(tasks, many=True, context={"request": request}).data
+    body = json.dumps(
+        [{"content": task["snippet"], "is_done": True} for task in data]
+    ).encode()
+
+    result = {"rows": ROWS}
+    for name, renderer, parser in [
+        ("json", JSONRenderer(), JSONParser()),
+        ("fast", FastJSONRenderer(), FastJSONParser()),
+    ]:
+        result[name] = {
+            "render_ms": measure(lambda: renderer.render(data)),
+            "parse_ms": measure(lambda: parser.parse(io.BytesIO(body))),
+        }
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    bench_results["task_renderer"] = result
@@ -0,0 +1,48 @@
+"""
+Full-text search backend of Task.content against the ILIKE scan of
+DRF's SearchFilter.
+
+    pytest benchmarks/bench_search.py -s
+"""
+import os
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+
+from accounts.models import User
+from todo.api.v1.filters import TaskSearchFilter
+from todo.api.v1.views import TaskModelViewSet
+from todo.models import Task
+from .utils import measure, seed_tasks
+
+HEAVY_USER_TASKS = int(os.environ.get("BENCH_TASKS", 20000))
+SEARCHES = {"common": "the", "rare": "zzyzx", "two words": "may light"}
+
+
+@pytest.mark.django_db
+def test_bench_task_search(bench_results):
+    user = User.objects.create_user(email="heavy@test.com", password="a")
+    seed_tasks(user, HEAVY_USER_TASKS)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE todo_task")
+    view = TaskModelViewSet(search_fields=["content"])
+    tasks = Task.objects.filter(author=user)
+
+    result = {}
+    for name, term in SEARCHES.items():
+        request = Request(APIRequestFactory().get("/", {"search": term}))
+        ilike = SearchFilter().filter_queryset(request, tasks, view)
+        full_text = TaskSearchFilter().filter_queryset(request, tasks, view)
+        result[name] = {
+            "term": term,
+            "ilike_matches": ilike.count(),
+            "full_text_matches": full_text.count(),
+            "ilike_page_ms": measure(lambda: list(ilike.all()[:5])),
+            "full_text_page_ms": measure(lambda: list(full_text.all()[:5])),
+            "ilike_count_ms": measure(ilike.count),
+            "full_text_count_ms": measure(full_text.count),
+        }
+    bench_results["task_search"] = result
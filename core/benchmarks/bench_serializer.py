@@ -0,0 +1,51 @@
+"""
+Rows per second of the task list representation, the generic DRF path
+(TaskSerializer.to_representation per row) against TaskListSerializer.
+
+    pytest benchmarks/bench_serializer.py -s
+"""
+import os
+
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from todo.api.v1.serializers import TaskSerializer
+from todo.models import Task
+from .utils import measure, seed_tasks
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1000))
+
+
+@pytest.mark.django_db
+def test_bench_task_list_serializer(bench_results):
+    user = User.objects.create_user(email="heavy@test.com", password="a")
+    seed_tasks(user, ROWS)
+    tasks = list(Task.objects.filter(author=user).select_related("author"))
+    request = Request(
+        APIRequestFactory().get("/api/v1/task/"),
+        parser_context={"kwargs": {}},
+    )
+    serializer = TaskSerializer(tasks, many=True, context={"request": request})
+    paths = {
+        "generic": lambda: serializers.ListSerializer.to_representation(
+            serializer, tasks
+        ),
+        "fast": lambda: serializer.to_representation(tasks),
+    }
+    rendered = {
+        name: JSONRenderer().render(path()) for name, path in paths.items()
+    }
+    assert rendered["generic"] == rendered["fast"]
+
+    result = {"rows": ROWS}
+    for name, path in paths.items():
+        ms = measure(path, repeat=10)
+        result[name] = {"ms": ms, "rows_per_s": round(ROWS / ms * 1000)}
+    result["speedup"] = round(
+        result["generic"]["ms"] / result["fast"]["ms"], 1
+    )
+    bench_results["task_list_serializer"] = result
@@ -0,0 +1,58 @@
+"""
+A burst of signups through SignupCreateView with the passwords hashed
+in the web worker and in the PASSWORD_HASH_WORKERS process pool:
+milliseconds each request is blocked (the time a sync worker is busy
+with it, the pool does not shorten it) and cpu milliseconds used by the
+web worker process per signup (what the pool moves out of it).
+
+    BENCH_SIGNUPS=100 pytest benchmarks/bench_signup.py -s
+"""
+import os
+import time
+from unittest import mock
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from accounts.hashers import OffloadedPBKDF2PasswordHasher, get_hash_executor
+
+SIGNUPS = int(os.environ.get("BENCH_SIGNUPS", 20))
+
+
+@pytest.mark.django_db
+def test_bench_signup_burst(bench_results, settings):
+    result = {"signups": SIGNUPS}
+    for name, workers in [("inline", 0), ("offloaded", 2)]:
+        settings.PASSWORD_HASH_WORKERS = workers
+        if workers:
+            # starting the pool before the burst
+            get_hash_executor().submit(int).result()
+        client = Client()
+        encode = mock.patch.object(
+            OffloadedPBKDF2PasswordHasher,
+            "encode",
+            autospec=True,
+            side_effect=OffloadedPBKDF2PasswordHasher.encode,
+        )
+        with encode as hashes:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            for i in range(SIGNUPS):
+                response = client.post(
+                    reverse("signup"),
+                    {
+                        "email": f"{name}{i}@test.com",
+                        "password1": "a/1234567",
+                        "password2": "a/1234567",
+                    },
+                )
+                assert response.status_code == 302
+                client.logout()
+            cpu = time.process_time() - cpu_start
+            seconds = time.perf_counter() - start
+        result[name] = {
+            "blocked_ms": round(seconds * 1000 / SIGNUPS, 3),
+            "cpu_ms": round(cpu * 1000 / SIGNUPS, 3),
+            "hashes_per_signup": hashes.call_count / SIGNUPS,
+        }
+    bench_results["signup_burst"] = result
@@ -0,0 +1,67 @@
+"""
+EXPLAIN plans and latency of the per-author task queries with and without
+the composite indexes on todo.Task.
+
+    pytest benchmarks/bench_task_indexes.py -s
+    SQL_ENGINE=django.db.backends.postgresql pytest benchmarks/... -s
+
+BENCH_TASKS changes the number of tasks of the heavy user (default 20000).
+"""
+import os
+
+import pytest
+from django.db import connection
+
+from accounts.models import User
+from todo.models import Task
+from .utils import measure, seed_tasks
+
+HEAVY_USER_TASKS = int(os.environ.get("BENCH_TASKS", 20000))
+
+
+def run_queries(user):
+    result = {}
+    tasks = Task.objects.filter(author=user)
+    querysets = {
+        "list first page": tasks[:5],
+        "list deep page": tasks[5000:5005],
+        "filter is_done": tasks.filter(is_done=False)[:5],
+    }
+    for name, qs in querysets.items():
+        result[name] = {
+            "plan": qs.explain().splitlines(),
+            "ms": measure(lambda qs=qs: list(qs.all())),
+        }
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_task_author_indexes(bench_results):
+    heavy = User.objects.create_user(email="heavy@test.com", password="a")
+    seed_tasks(heavy, HEAVY_USER_TASKS)
+    for i in range(10):
+        other = User.objects.create_user(email=f"o{i}@test.com", password="a")
+        seed_tasks(other, HEAVY_USER_TASKS // 10, seed=i)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE todo_task")
+
+    with_indexes = run_queries(heavy)
+    with connection.schema_editor() as editor:
+        for index in Task._meta.indexes:
+            editor.remove_index(Task, index)
+    try:
+        without_indexes = run_queries(heavy)
+    finally:
+        with connection.schema_editor() as editor:
+            for index in Task._meta.indexes:
+                editor.add_index(Task, index)
+
+    bench_results["task_author_indexes"] = {
+        "tasks": Task.objects.count(),
+        "with_indexes": with_indexes,
+        "without_indexes": without_indexes,
+    }
+    if connection.vendor == "sqlite":
+        # the composite indexes give the rows in order, no sort step needed
+        for result in with_indexes.values():
+            assert "TEMP B-TREE" not in " ".join(result["plan"])
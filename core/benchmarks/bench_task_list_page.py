@@ -0,0 +1,59 @@
+"""
+Rendering the html task list of a user with 10k tasks: all the rows in
+one page (what the list did before pagination) against a page of
+TaskListView with a cold and a warm row fragment cache.
+
+    pytest benchmarks/bench_task_list_page.py -s
+"""
+import os
+
+import pytest
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from accounts.models import User
+from todo.models import Task
+from .utils import measure, seed_tasks
+
+HEAVY_USER_TASKS = int(os.environ.get("BENCH_TASKS", 10000))
+
+
+@pytest.mark.django_db
+def test_bench_task_list_page(bench_results):
+    user = User.objects.create_user(
+        email="heavy@test.com", password="a", is_verified=True
+    )
+    seed_tasks(user, HEAVY_USER_TASKS)
+    client = Client()
+    client.force_login(user)
+    endpoint = reverse("todo:index")
+    request = RequestFactory().get(endpoint)
+    request.user = user
+    tasks = list(Task.objects.filter(author=user))
+    fragments = caches["fragments"]
+
+    def render_all():
+        fragments.clear()
+        return render_to_string(
+            "todo/index.html",
+            {"tasks": tasks, "fragment_timeout": 0},
+            request=request,
+        )
+
+    def page_cold():
+        fragments.clear()
+        return client.get(endpoint)
+
+    result = {
+        "tasks": HEAVY_USER_TASKS,
+        "all rows": {
+            "ms": measure(render_all, repeat=3, warmup=1),
+            "kb": len(render_all()) // 1024,
+        },
+        "page cold cache": {"ms": measure(page_cold)},
+        "page warm cache": {"ms": measure(lambda: client.get(endpoint))},
+    }
+    result["page cold cache"]["kb"] = len(client.get(endpoint).content) // 1024
+    bench_results["task_list_page"] = result
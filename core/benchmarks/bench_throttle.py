@@ -0,0 +1,62 @@
+"""
+Overhead per request of the TokenBucketThrottle (ip, email and global
+buckets) of the auth endpoints, on the local memory cache and, with
+BENCH_REDIS_URL, on redis with the lua script.
+
+    BENCH_REDIS_URL=redis://localhost:6379/3 \
+        pytest benchmarks/bench_throttle.py -s
+"""
+import os
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.renderers import FastJSONParser
+from core.throttling import TokenBucketThrottle
+from .utils import measure
+
+REDIS_URL = os.environ.get("BENCH_REDIS_URL")
+
+
+class LoginView:
+    throttle_scope = "bench"
+
+
+def test_bench_throttle(bench_results, settings):
+    settings.AUTH_THROTTLE_RATES = {
+        "ip": "1000000/s",
+        "email": "1000000/s",
+        "global": "1000000/s",
+    }
+    backends = {"locmem": "default"}
+    if REDIS_URL:
+        settings.CACHES = dict(
+            settings.CACHES,
+            throttle_redis={
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": REDIS_URL,
+            },
+        )
+        backends["redis"] = "throttle_redis"
+    request = Request(
+        APIRequestFactory().post(
+            "/accounts/api/v1/token/login/",
+            {"email": "bench@test.com", "password": "a/1234567"},
+            format="json",
+        ),
+        parsers=[FastJSONParser()],
+    )
+    request.data  # parsing the body like the view does before throttling
+    view = LoginView()
+
+    result = {}
+    for name, alias in backends.items():
+        settings.AUTH_THROTTLE_CACHE = alias
+
+        def check():
+            assert TokenBucketThrottle().allow_request(request, view)
+
+        ms = measure(check, repeat=1000, warmup=10)
+        assert ms < 1
+        result[name] = {"ms": ms}
+    bench_results["throttle"] = result
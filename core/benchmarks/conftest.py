@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from django.db import connection
+
+from .utils import compare_results
+
+# the --bench-size choices of the root conftest
+BENCH_SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+@pytest.fixture(scope="session")
+def bench_size(request):
+    """
+    number of tasks to seed, from --bench-size
+    """
+    return BENCH_SIZES[request.config.getoption("--bench-size")]
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    """
+    collecting benchmark results of the session, keyed by benchmark name,
+    failing the session when they regressed against --bench-baseline
+    """
+    config = request.config
+    results = {
+        "vendor": connection.vendor,
+        "size": config.getoption("--bench-size"),
+        "benchmarks": {},
+    }
+    yield results["benchmarks"]
+    print("\n" + json.dumps(results, indent=2, default=str))
+    if path := config.getoption("--bench-json"):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    if path := config.getoption("--bench-baseline"):
+        with open(path) as f:
+            baseline = json.load(f)
+        regressions = compare_results(
+            results["benchmarks"],
+            baseline.get("benchmarks", {}),
+            config.getoption("--bench-threshold"),
+        )
+        if regressions:
+            pytest.fail(
+                "benchmarks regressed against {}:\n{}".format(
+                    path, "\n".join(regressions)
+                ),
+                pytrace=False,
+            )
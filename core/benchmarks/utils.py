@@ -0,0 +1,88 @@
+import statistics
+import time
+from datetime import timedelta
+from random import Random
+
+from django.utils import timezone
+from faker import Faker
+
+from todo.models import Task
+from todo.utils import manual_dates
+
+
+def measure(func, repeat=20, warmup=2):
+    """
+    run func several times and return the median wall time in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def seed_tasks(author, number, done_ratio=0.5, days=365, seed=0):
+    """
+    bulk insert number of tasks for author spread over the last days
+    """
+    rnd = Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+    now = timezone.now()
+    tasks = []
+    for _ in range(number):
+        created = now - timedelta(seconds=rnd.randint(0, days * 24 * 3600))
+        tasks.append(
+            Task(
+                author=author,
+                content=fake.sentence(),
+                is_done=rnd.random() < done_ratio,
+                created_date=created,
+                updated_date=created,
+            )
+        )
+    with manual_dates(Task, "created_date", "updated_date"):
+        Task.objects.bulk_create(tasks, batch_size=2000)
+
+
+def flatten(results, prefix=""):
+    """
+    nested benchmark results as {"name.sub.metric": value}
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def compare_results(results, baseline, threshold):
+    """
+    list of the metrics that got worse than the baseline, timings ("ms")
+    may be slower by the threshold ratio, query counts may not grow at all
+    and throughputs ("per_s") may be lower by the threshold ratio
+    """
+    baseline = flatten(baseline)
+    regressions = []
+    for name, value in flatten(results).items():
+        old = baseline.get(name)
+        if not isinstance(old, (int, float)) or not old:
+            continue
+        metric = name.rsplit(".", 1)[-1]
+        if metric.endswith("ms"):
+            worse = value > old * (1 + threshold)
+        elif metric == "queries":
+            worse = value > old
+        elif metric.endswith("per_s"):
+            worse = value < old * (1 - threshold)
+        else:
+            continue
+        if worse:
+            regressions.append(f"{name}: {old} -> {value}")
+    return regressions
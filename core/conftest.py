@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pytest
+from django.core.cache import caches
+
+BENCHMARKS = Path(__file__).parent / "benchmarks"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="run the benchmarks collected with the tests",
+    )
+    group.addoption(
+        "--bench-json",
+        action="store",
+        default=None,
+        help="write the benchmark results to this json file",
+    )
+    group.addoption(
+        "--bench-size",
+        action="store",
+        default="1k",
+        choices=["1k", "100k", "1m"],
+        help="number of seeded tasks of the api benchmarks (default: 1k)",
+    )
+    group.addoption(
+        "--bench-baseline",
+        action="store",
+        default=None,
+        help="compare the results with this json file of a previous run",
+    )
+    group.addoption(
+        "--bench-threshold",
+        action="store",
+        type=float,
+        default=0.25,
+        help="allowed slowdown against the baseline (default: 0.25)",
+    )
+
+
+def benchmarks_requested(config):
+    """
+    --run-benchmarks, a --bench-json/--bench-baseline run or a path in
+    benchmarks/ given on the command line
+    """
+    if any(
+        config.getoption(option)
+        for option in ("--run-benchmarks", "--bench-json", "--bench-baseline")
+    ):
+        return True
+    for arg in config.args:
+        path = Path(arg.split("::")[0]).resolve()
+        if path == BENCHMARKS or BENCHMARKS in path.parents:
+            return True
+    return False
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    skipping the benchmarks collected by a plain run (pytest . in ci)
+    """
+    if benchmarks_requested(config):
+        return
+    skip = pytest.mark.skip(reason="benchmarks need --run-benchmarks")
+    for item in items:
+        if BENCHMARKS in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """
+    using a fresh local memory cache instead of redis in tests
+    """
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "fragments": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "fragments",
+        },
+    }
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    yield
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+@pytest.fixture(autouse=True)
+def raise_query_budget(settings):
+    """
+    failing the tests of requests over their view's query budget
+    """
+    settings.QUERY_BUDGET_RAISE = True
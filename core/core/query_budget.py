@@ -0,0 +1,103 @@
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    raised when a request or a block makes more queries than its budget
+    """
+
+
+class QueryCounter:
+    """
+    execute wrapper counting the queries run on a connection
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def check_query_budget(name, count, budget):
+    """
+    Raising QueryBudgetExceeded (QUERY_BUDGET_RAISE, on in tests) or
+    logging a warning when count is over budget
+    """
+    if budget is None or count <= budget:
+        return
+    message = f"{name} made {count} queries, its budget is {budget}"
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+@contextmanager
+def query_budget(budget, name="block"):
+    """
+    Checking the number of queries of the with block against budget:
+
+        with query_budget(2):
+            list(Task.objects.select_related("author"))
+    """
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+    check_query_budget(name, counter.count, budget)
+
+
+def get_view_query_budget(request):
+    """
+    The query_budget attribute of the view class that handled the request,
+    either a number or a dict by viewset action / lower case http method
+    with an optional "default"
+    """
+    match = request.resolver_match
+    view = getattr(match.func, "cls", None) or getattr(
+        match.func, "view_class", None
+    )
+    budget = getattr(view, "query_budget", None)
+    if isinstance(budget, dict):
+        method = request.method.lower()
+        actions = getattr(match.func, "actions", None) or {}
+        budget = budget.get(actions.get(method, method), budget.get("default"))
+    return budget
+
+
+class QueryBudgetMiddleware:
+    """
+    Counting the queries of each request against the query_budget
+    declared on its view, the body of a streaming response is made after
+    the middleware returns so its queries are counted while it streams
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        if request.resolver_match is None:
+            return response
+        name = f"{request.method} {request.resolver_match.view_name}"
+        budget = get_view_query_budget(request)
+        if response.streaming:
+            response.streaming_content = self.count_streamed(
+                response.streaming_content, counter, name, budget
+            )
+        else:
+            check_query_budget(name, counter.count, budget)
+        return response
+
+    def count_streamed(self, content, counter, name, budget):
+        with connection.execute_wrapper(counter):
+            yield from content
+        check_query_budget(name, counter.count, budget)
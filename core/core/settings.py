@@ -57,6 +57,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.query_budget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,6 +68,7 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "core.urls"
 
+# out of debug django keeps the compiled templates (cached.Loader)
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -127,6 +129,21 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+AUTHENTICATION_BACKENDS = ["django.contrib.auth.backends.ModelBackend"]
+
+# the first one hashes the new passwords, the others check the old hashes;
+# one hasher per algorithm, identify_hasher takes the last one listed
+PASSWORD_HASHERS = [
+    "accounts.hashers.OffloadedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
+# processes hashing the passwords out of the web workers (0: off)
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=0)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -172,6 +189,107 @@ EMAIL_PORT = 25
 EMAIL_USE_TLS = False
 EMAIL_HOST_USER = ""
 EMAIL_HOST_PASSWORD = ""
+# the outbound email queue (accounts.tasks.send_outbound_emails)
+EMAIL_QUEUE_BATCH_SIZE = config(
+    "EMAIL_QUEUE_BATCH_SIZE", cast=int, default=100
+)
+EMAIL_QUEUE_TIME_BUDGET = config(
+    "EMAIL_QUEUE_TIME_BUDGET", cast=int, default=50
+)
+EMAIL_QUEUE_MAX_ATTEMPTS = config(
+    "EMAIL_QUEUE_MAX_ATTEMPTS", cast=int, default=5
+)
+# seconds before the first retry, doubled on each attempt
+EMAIL_QUEUE_RETRY_DELAY = config(
+    "EMAIL_QUEUE_RETRY_DELAY", cast=int, default=60
+)
+# seconds after which emails a dead worker left sending are claimed again
+EMAIL_QUEUE_STALE_AFTER = config(
+    "EMAIL_QUEUE_STALE_AFTER", cast=int, default=600
+)
+
+# pagination of the task api: "page" (page number) or "cursor" (keyset)
+TASK_PAGINATION = config("TASK_PAGINATION", default="page")
+
+# seconds to cache the task api list/detail responses per user (0: off)
+TASK_CACHE_TIMEOUT = config("TASK_CACHE_TIMEOUT", cast=int, default=60 * 5)
+
+# seconds to cache the rendered rows of the html task list
+TASK_FRAGMENT_CACHE_TIMEOUT = config(
+    "TASK_FRAGMENT_CACHE_TIMEOUT", cast=int, default=60 * 10
+)
+
+# dotted path of the task search backend, empty: chosen by database vendor
+TASK_SEARCH_BACKEND = config("TASK_SEARCH_BACKEND", default="")
+
+# rows per batch and seconds per run of the done tasks cleanup
+TASK_CLEANUP_BATCH_SIZE = config(
+    "TASK_CLEANUP_BATCH_SIZE", cast=int, default=1000
+)
+TASK_CLEANUP_TIME_BUDGET = config(
+    "TASK_CLEANUP_TIME_BUDGET", cast=int, default=60
+)
+
+# what the periodic job does with done tasks: "archive" moves the ones
+# done TASK_ARCHIVE_AFTER_DAYS ago to the history, "delete" removes all
+TASK_DONE_POLICY = config("TASK_DONE_POLICY", default="archive")
+TASK_ARCHIVE_AFTER_DAYS = config(
+    "TASK_ARCHIVE_AFTER_DAYS", cast=int, default=30
+)
+
+# days the tombstones of deleted tasks are kept for the sync api, older
+# sync tokens get 410 and have to sync from scratch
+TASK_TOMBSTONE_RETENTION_DAYS = config(
+    "TASK_TOMBSTONE_RETENTION_DAYS", cast=int, default=30
+)
+# seconds the sync api stays behind now, rows are dated before their
+# transaction commits and must be committed once a sync passes them
+TASK_SYNC_SAFETY_WINDOW = config(
+    "TASK_SYNC_SAFETY_WINDOW", cast=int, default=10
+)
+
+# seconds the token and jwt authentication keep users cached (0: off)
+AUTH_CACHE_TIMEOUT = config("AUTH_CACHE_TIMEOUT", cast=int, default=60)
+
+# seconds basic authentication skips hashing verified credentials (0: off)
+AUTH_BASIC_CACHE_TIMEOUT = config(
+    "AUTH_BASIC_CACHE_TIMEOUT", cast=int, default=30
+)
+
+# token buckets of the login, registration and password reset endpoints
+# (core.throttling), per client ip, per email and for all clients
+AUTH_THROTTLE_CACHE = "default"
+AUTH_THROTTLE_RATES = {
+    "ip": config("AUTH_THROTTLE_IP_RATE", default="20/min"),
+    "email": config("AUTH_THROTTLE_EMAIL_RATE", default="10/min"),
+    "global": config("AUTH_THROTTLE_GLOBAL_RATE", default="600/min"),
+}
+
+# openweather api of the weather views (core.weather)
+WEATHER_API_URL = config(
+    "WEATHER_API_URL",
+    default="https://api.openweathermap.org/data/2.5/weather",
+)
+WEATHER_API_KEY = config(
+    "WEATHER_API_KEY", default="14c28b49f30220e538754ff09fe6b077"
+)
+WEATHER_CITY = config("WEATHER_CITY", default="Tehran")
+# (connect, read) timeouts of the api requests in seconds
+WEATHER_TIMEOUT = (
+    config("WEATHER_CONNECT_TIMEOUT", cast=float, default=2),
+    config("WEATHER_READ_TIMEOUT", cast=float, default=3),
+)
+# seconds the weather is fresh, then it is refreshed in the background
+WEATHER_CACHE_TIMEOUT = config("WEATHER_CACHE_TIMEOUT", cast=int, default=1200)
+# seconds a stale weather may still be served
+WEATHER_STALE_TIMEOUT = config(
+    "WEATHER_STALE_TIMEOUT", cast=int, default=86400
+)
+# seconds requests wait for the first weather fetched by another request
+WEATHER_WAIT = config("WEATHER_WAIT", cast=float, default=5)
+
+# requests over the query_budget of their view raise (tests) or log
+QUERY_BUDGET_RAISE = config("QUERY_BUDGET_RAISE", cast=bool, default=False)
 ###############################################
 
 ############### Third Party ###################
@@ -184,11 +302,25 @@ REST_FRAMEWORK = {
 # rest_framework authentication config
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
+        "accounts.authentication.CachedBasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ]
+        "accounts.authentication.CachedTokenAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
+    ],
+    # orjson when installed, core.renderers falls back to the stdlib json
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # proxies in front of django (1 behind the stage nginx), throttles
+    # take the client ip from X-Forwarded-For only past these, with 0 it
+    # is REMOTE_ADDR and a client can not pick its ip with the header
+    "NUM_PROXIES": config("NUM_PROXIES", cast=int, default=0),
 }
 
 # simple_jwt
@@ -210,7 +342,13 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
-    }
+    },
+    # rendered html fragments (task list rows), per process
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "fragments",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
 }
 
 ###############################################
@@ -0,0 +1,46 @@
+import io
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from core.renderers import FastJSONRenderer, FastJSONParser
+
+
+class TestFastJSON:
+    data = {
+        "id": 1,
+        "content": "line\u2028separator é",
+        "date": datetime(2022, 9, 1, 10, 5, 7, 123456, tzinfo=timezone.utc),
+        "price": Decimal("1.50"),
+        "lazy": gettext_lazy("Not found."),
+        "nested": [{"is_done": True, "none": None}],
+        3: "int key",
+    }
+
+    def test_render_is_identical_to_json_renderer(self):
+        rendered = FastJSONRenderer().render(self.data)
+        assert rendered == JSONRenderer().render(self.data)
+        assert b'"2022-09-01T10:05:07.123456Z"' in rendered
+
+    def test_render_indented_falls_back(self):
+        media_type = "application/json; indent=4"
+        assert FastJSONRenderer().render(
+            self.data, media_type
+        ) == JSONRenderer().render(self.data, media_type)
+
+    def test_render_none(self):
+        assert FastJSONRenderer().render(None) == b""
+
+    def test_parse(self):
+        body = '{"content": "é", "ids": [1, 2], "is_done": false}'
+        stream = io.BytesIO(body.encode())
+        assert FastJSONParser().parse(stream) == JSONParser().parse(
+            io.BytesIO(body.encode())
+        )
+
+    def test_parse_error(self):
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"content": NaN}'))
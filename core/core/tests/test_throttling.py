@@ -0,0 +1,140 @@
+import time
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from redis.exceptions import ConnectionError
+from rest_framework.test import APIClient
+
+from core.throttling import TokenBucketThrottle, parse_rate
+
+
+def test_parse_rate():
+    assert parse_rate("10/min") == (10, 10 / 60)
+    assert parse_rate("2/s") == (2, 2)
+    assert parse_rate(None) is None
+
+
+@pytest.mark.django_db
+class TestTokenBucketThrottle:
+    url = "accounts:api-v1:token-login"
+
+    def login(self, email="test@test.com", ip="10.0.0.1"):
+        return APIClient().post(
+            reverse(self.url),
+            {"email": email, "password": "wrong"},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_429_with_retry_after_per_email(self, settings):
+        settings.AUTH_THROTTLE_RATES = {"ip": None, "email": "2/min"}
+        assert self.login().status_code == 400
+        assert self.login(ip="10.0.0.2").status_code == 400
+        response = self.login(ip="10.0.0.3")
+        assert response.status_code == 429
+        assert 0 < int(response["Retry-After"]) <= 30
+        assert self.login(email="other@test.com").status_code == 400
+
+    def test_429_per_ip(self, settings):
+        settings.AUTH_THROTTLE_RATES = {"ip": "1/min", "email": None}
+        assert self.login().status_code == 400
+        assert self.login(email="other@test.com").status_code == 429
+        assert self.login(ip="10.0.0.2").status_code == 400
+
+    def test_global_bucket_and_refill(self, settings):
+        settings.AUTH_THROTTLE_RATES = {"global": "1/s"}
+        with mock.patch("core.throttling.time.time", return_value=1000.0):
+            assert self.login().status_code == 400
+            assert self.login(ip="10.0.0.2").status_code == 429
+        with mock.patch("core.throttling.time.time", return_value=1001.0):
+            assert self.login(ip="10.0.0.2").status_code == 400
+
+    def test_spoofed_forwarded_for_still_throttled(self, settings):
+        settings.AUTH_THROTTLE_RATES = {"ip": "1/min", "email": None}
+        client = APIClient()
+        url = reverse(self.url)
+        data = {"email": "test@test.com", "password": "wrong"}
+        response = client.post(url, data, HTTP_X_FORWARDED_FOR="1.1.1.1")
+        assert response.status_code == 400
+        response = client.post(url, data, HTTP_X_FORWARDED_FOR="2.2.2.2")
+        assert response.status_code == 429
+
+    def test_forwarded_for_past_the_proxies(self, settings):
+        settings.AUTH_THROTTLE_RATES = {"ip": "1/min", "email": None}
+        settings.REST_FRAMEWORK = dict(settings.REST_FRAMEWORK, NUM_PROXIES=1)
+        client = APIClient()
+        url = reverse(self.url)
+        data = {"email": "test@test.com", "password": "wrong"}
+        # the proxy appends the address it got the request from
+        response = client.post(
+            url, data, HTTP_X_FORWARDED_FOR="1.1.1.1, 10.0.0.1"
+        )
+        assert response.status_code == 400
+        response = client.post(
+            url, data, HTTP_X_FORWARDED_FOR="2.2.2.2, 10.0.0.1"
+        )
+        assert response.status_code == 429
+        response = client.post(
+            url, data, HTTP_X_FORWARDED_FOR="1.1.1.1, 10.0.0.2"
+        )
+        assert response.status_code == 400
+
+    def test_redis_failure_lets_requests_through(self, settings):
+        settings.AUTH_THROTTLE_RATES = {"ip": "1/min"}
+        throttle = TokenBucketThrottle()
+        throttle.cache = mock.Mock()
+        throttle.cache.make_key = lambda key: key
+        throttle.cache.client.get_client.side_effect = ConnectionError()
+        request = mock.Mock(META={"REMOTE_ADDR": "10.0.0.1"}, data={})
+        assert throttle.allow_request(request, mock.Mock())
+
+
+class FakeRedisCache:
+    """
+    the parts of a django_redis cache the throttle uses, on fakeredis
+    """
+
+    def __init__(self, server):
+        self.client = mock.Mock()
+        self.client.get_client.return_value = server
+
+    def make_key(self, key):
+        return f":1:{key}"
+
+
+@pytest.fixture
+def redis_throttle(settings):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    settings.AUTH_THROTTLE_RATES = {"ip": "2/s", "global": "100/s"}
+    server = fakeredis.FakeRedis()
+    TokenBucketThrottle.script = None
+    throttle = TokenBucketThrottle()
+    throttle.cache = FakeRedisCache(server)
+    yield throttle, server
+    TokenBucketThrottle.script = None
+
+
+def test_redis_script_consume_reject_refill(redis_throttle):
+    throttle, server = redis_throttle
+    request = mock.Mock(META={"REMOTE_ADDR": "10.0.0.1"}, data={})
+    view = mock.Mock(throttle_scope="login")
+    assert throttle.allow_request(request, view)
+    assert throttle.allow_request(request, view)
+    assert not throttle.allow_request(request, view)
+    # half a second for a token at 2/s
+    wait = throttle.wait()
+    assert 0.3 < wait <= 0.5
+    ip_key = ":1:throttle:login:ip:10.0.0.1"
+    global_key = ":1:throttle:login:global:all"
+    assert float(server.hget(ip_key, "tokens")) < 1
+    # a rejected request takes no token from the other buckets
+    assert float(server.hget(global_key, "tokens")) == pytest.approx(
+        98, abs=0.5
+    )
+    assert 0 < server.pttl(ip_key) <= 1000
+    other = mock.Mock(META={"REMOTE_ADDR": "10.0.0.2"}, data={})
+    assert throttle.allow_request(other, view)
+    time.sleep(wait + 0.05)
+    assert throttle.allow_request(request, view)
+    assert throttle.wait() == 0
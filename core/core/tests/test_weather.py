@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import weather
+from core.weather import WeatherUnavailable, get_weather
+
+
+class FakeOpenWeather(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            server.temperature += 1
+            temperature = server.temperature
+        time.sleep(server.delay)
+        body = json.dumps(
+            {"name": "Tehran", "main": {"temp": temperature}, "dt": 0}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def openweather(settings):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenWeather)
+    server.daemon_threads = True
+    # the clients of the timeout tests are gone when the response is sent
+    server.handle_error = lambda request, client_address: None
+    server.hits, server.temperature, server.delay = 0, 0, 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.WEATHER_API_URL = "http://{}:{}/weather".format(
+        *server.server_address
+    )
+    settings.WEATHER_TIMEOUT = (0.5, 0.5)
+    settings.WEATHER_WAIT = 2
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_fresh_weather_cached(openweather):
+    assert get_weather()["temperature"] == 1
+    assert get_weather()["temperature"] == 1
+    assert openweather.hits == 1
+
+
+def test_stale_weather_served_while_refreshed_once(openweather, settings):
+    get_weather()
+    settings.WEATHER_CACHE_TIMEOUT = 0
+    openweather.delay = 0.2
+    assert [get_weather()["temperature"] for _ in range(5)] == [1] * 5
+    wait_for(
+        lambda: cache.get(weather.get_cache_key("Tehran"))["temperature"] == 2
+    )
+    assert openweather.hits == 2
+
+
+def test_single_flight_without_cached_weather(openweather):
+    openweather.delay = 0.2
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_weather()))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [result["temperature"] for result in results] == [1] * 5
+    assert openweather.hits == 1
+
+
+def test_upstream_timeout(openweather, settings):
+    openweather.delay = 1
+    with pytest.raises(WeatherUnavailable):
+        get_weather()
+    # the lock is released for the next request
+    assert not cache.get(weather.get_cache_key("Tehran") + ":lock")
+
+
+def test_failed_refresh_keeps_stale_weather(openweather, settings):
+    get_weather()
+    settings.WEATHER_CACHE_TIMEOUT = 0
+    settings.WEATHER_API_URL = "http://127.0.0.1:1/weather"
+    assert get_weather()["temperature"] == 1
+    wait_for(lambda: not cache.get(weather.get_cache_key("Tehran") + ":lock"))
+    assert get_weather()["temperature"] == 1
+
+
+def test_weather_api_view(openweather):
+    response = APIClient().get(reverse("api-weather"))
+    assert response.status_code == 200
+    assert response.data["City"] == "Tehran"
+    with mock.patch(
+        "core.views.get_weather", side_effect=WeatherUnavailable("down")
+    ):
+        response = APIClient().get(reverse("api-weather"))
+    assert response.status_code == 503
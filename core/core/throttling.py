@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# checking every bucket first and taking a token from each of them only
+# when all have one, in a single round trip, returns the seconds to wait
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call("HMGET", key, "tokens", "time")
+    local level = capacity
+    if state[1] then
+        level = math.min(
+            capacity,
+            tonumber(state[1]) + math.max(0, now - tonumber(state[2])) * rate
+        )
+    end
+    levels[i] = level
+    if level < 1 then
+        wait = math.max(wait, (1 - level) / rate)
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call("HSET", key, "tokens", levels[i] - 1, "time", now)
+    redis.call("PEXPIRE", key, math.ceil(capacity / rate * 1000))
+end
+return "0"
+"""
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    "10/min" as (capacity, tokens per second), None for no limit
+    """
+    if rate is None:
+        return None
+    number, period = rate.split("/")
+    number = int(number)
+    return number, number / DURATIONS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle of the expensive (password hashing, email)
+    endpoints, limiting each client ip, each email in the request body and
+    all the requests of the view's throttle_scope together with the
+    AUTH_THROTTLE_RATES ({"ip": "20/min", "email": ..., "global": ...}).
+
+    The buckets live in the AUTH_THROTTLE_CACHE cache: one lua script call
+    on redis (django_redis), a non atomic get/set on other backends.
+    Requests are let through when redis is down.
+    """
+
+    cache_alias = None
+    key_prefix = "throttle"
+    script = None
+
+    def __init__(self):
+        self.cache = caches[self.cache_alias or settings.AUTH_THROTTLE_CACHE]
+        self.rates = {
+            name: parse_rate(rate)
+            for name, rate in settings.AUTH_THROTTLE_RATES.items()
+        }
+        self._wait = 0
+
+    def get_email(self, request):
+        try:
+            email = request.data.get("email")
+        except AttributeError:
+            return None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # not keeping the emails in the cache
+        return hashlib.md5(email.strip().lower().encode()).hexdigest()
+
+    def get_buckets(self, request, view):
+        """
+        {cache key: (capacity, tokens per second)} of the request
+        """
+        scope = getattr(view, "throttle_scope", view.__class__.__name__)
+        idents = {
+            "ip": self.get_ident(request),
+            "email": self.get_email(request),
+            "global": "all",
+        }
+        return {
+            f"{self.key_prefix}:{scope}:{name}:{ident}": self.rates[name]
+            for name, ident in idents.items()
+            if ident is not None and self.rates.get(name)
+        }
+
+    def allow_request(self, request, view):
+        buckets = self.get_buckets(request, view)
+        if not buckets:
+            return True
+        if hasattr(self.cache, "client") and hasattr(
+            self.cache.client, "get_client"
+        ):
+            try:
+                self._wait = self.consume_redis(buckets)
+            except RedisError as exc:
+                logger.warning("throttle is off, redis failed: %r", exc)
+                return True
+        else:
+            self._wait = self.consume_cache(buckets)
+        return self._wait <= 0
+
+    def consume_redis(self, buckets):
+        client = self.cache.client.get_client(write=True)
+        if TokenBucketThrottle.script is None:
+            TokenBucketThrottle.script = client.register_script(
+                TOKEN_BUCKET_SCRIPT
+            )
+        args = [value for rate in buckets.values() for value in rate]
+        keys = [self.cache.make_key(key) for key in buckets]
+        return float(self.script(keys=keys, args=args, client=client))
+
+    def consume_cache(self, buckets):
+        now = time.time()
+        states = self.cache.get_many(list(buckets))
+        levels, wait = {}, 0
+        for key, (capacity, rate) in buckets.items():
+            level, last = states.get(key, (capacity, now))
+            level = min(capacity, level + max(0, now - last) * rate)
+            levels[key] = level
+            if level < 1:
+                wait = max(wait, (1 - level) / rate)
+        if wait > 0:
+            return wait
+        for key, (capacity, rate) in buckets.items():
+            self.cache.set(
+                key,
+                (levels[key] - 1, now),
+                timeout=math.ceil(capacity / rate),
+            )
+        return 0
+
+    def wait(self):
+        return self._wait
@@ -17,7 +17,6 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.decorators.cache import cache_page
 
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -67,11 +66,7 @@ urlpatterns = [
         schema_view.with_ui("redoc", cache_timeout=0),
         name="schema-redoc",
     ),
-    path(
-        "weather/",
-        cache_page(60 * 20)(WeatherView.as_view()),
-        name="weather",
-    ),
+    path("weather/", WeatherView.as_view(), name="weather"),
     path("weather/api/", WeatherAPIView.as_view(), name="api-weather"),
 ]
 
@@ -1,53 +1,51 @@
 from django.views.generic import TemplateView
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-import requests
 from datetime import datetime
 
+from core.weather import WeatherUnavailable, get_weather
+
+
+def weather_data(weather):
+    return {
+        "City": weather["city"],
+        "Temperature": weather["temperature"],
+        "Temperature time": datetime.fromtimestamp(weather["time"]),
+        "Cached at": datetime.fromtimestamp(weather["fetched_at"]),
+    }
+
 
 class WeatherView(TemplateView):
     """
     getting weather from openweather api
-    (it cached in urls.py)
+    (cached by core.weather, served stale while it is refreshed)
     """
 
     template_name = "weather.html"
 
     def get(self, request, *args, **kwargs):
         context = self.get_context_data(**kwargs)
-        url = "https://api.openweathermap.org/data/2.5/weather"
-        api_key = "14c28b49f30220e538754ff09fe6b077"
-        city = "Tehran"
-        params = {"q": city, "appid": api_key, "units": "metric"}
-        response = requests.get(url, params=params).json()
-        context["data"] = {
-            "City": response["name"],
-            "Temperature": response["main"]["temp"],
-            "Temperature time": datetime.fromtimestamp(response["dt"]),
-            "Cached at": datetime.now(),
-        }
+        try:
+            context["data"] = weather_data(get_weather())
+        except WeatherUnavailable:
+            context["data"] = {"Weather": "not available, try again later"}
+            return self.render_to_response(context, status=503)
         return self.render_to_response(context)
 
 
 class WeatherAPIView(APIView):
     """
     getting weather from openweather api
-    (it cached with method decorator and cache_page decorator)
+    (cached by core.weather, served stale while it is refreshed)
     """
 
-    @method_decorator(cache_page(60 * 20))
     def get(self, request, format=None):
-        url = "https://api.openweathermap.org/data/2.5/weather"
-        api_key = "14c28b49f30220e538754ff09fe6b077"
-        city = "Tehran"
-        params = {"q": city, "appid": api_key, "units": "metric"}
-        response = requests.get(url, params=params).json()
-        data = {
-            "City": response["name"],
-            "Temperature": response["main"]["temp"],
-            "Temperature time": datetime.fromtimestamp(response["dt"]),
-            "Cached at": datetime.now(),
-        }
-        return Response(data)
+        try:
+            weather = get_weather()
+        except WeatherUnavailable:
+            return Response(
+                {"detail": "Weather is not available, try again later"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(weather_data(weather))
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class WeatherUnavailable(Exception):
+    """
+    raised when there is no weather to serve, not even a stale one
+    """
+
+
+def get_session():
+    """
+    the requests Session of the weather api, reusing its connections
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            # no retries, a failed refresh keeps serving the stale weather
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=10, max_retries=0
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+    return _session
+
+
+def fetch_weather(city):
+    """
+    Getting the current weather of city from the openweather api with the
+    WEATHER_TIMEOUT (connect, read) timeouts
+    """
+    response = get_session().get(
+        settings.WEATHER_API_URL,
+        params={
+            "q": city,
+            "appid": settings.WEATHER_API_KEY,
+            "units": "metric",
+        },
+        timeout=settings.WEATHER_TIMEOUT,
+    )
+    response.raise_for_status()
+    data = response.json()
+    return {
+        "city": data["name"],
+        "temperature": data["main"]["temp"],
+        "time": data["dt"],
+        "fetched_at": time.time(),
+    }
+
+
+def get_cache_key(city):
+    return f"weather:{city.lower()}"
+
+
+def refresh_weather(city):
+    """
+    Fetching and caching the weather of city, the cached weather is kept
+    (and served stale) for WEATHER_STALE_TIMEOUT seconds
+    """
+    weather = fetch_weather(city)
+    cache.set(
+        get_cache_key(city), weather, timeout=settings.WEATHER_STALE_TIMEOUT
+    )
+    return weather
+
+
+def _refresh_locked(city, lock_key):
+    try:
+        return refresh_weather(city)
+    finally:
+        cache.delete(lock_key)
+
+
+def _refresh_in_background(city, lock_key):
+    try:
+        _refresh_locked(city, lock_key)
+    except (requests.RequestException, KeyError, ValueError) as exc:
+        logger.warning("refreshing the weather of %s failed: %r", city, exc)
+
+
+def start_refresh(city, lock_key):
+    threading.Thread(
+        target=_refresh_in_background, args=(city, lock_key), daemon=True
+    ).start()
+
+
+def get_weather(city=None):
+    """
+    The weather of city (WEATHER_CITY by default) from the cache.
+
+    Weather older than WEATHER_CACHE_TIMEOUT seconds is still returned
+    while a single background thread (the one getting the lock) refreshes
+    it. Without any cached weather the lock holder fetches it and the other
+    requests wait for it up to WEATHER_WAIT seconds, only one request goes
+    to the api at a time. Raises WeatherUnavailable.
+    """
+    city = city or settings.WEATHER_CITY
+    key = get_cache_key(city)
+    lock_key = f"{key}:lock"
+    # a lock left by a dead refresh expires after the request timeouts
+    lock_timeout = sum(settings.WEATHER_TIMEOUT) + 1
+    weather = cache.get(key)
+    if weather is not None:
+        age = time.time() - weather["fetched_at"]
+        if age > settings.WEATHER_CACHE_TIMEOUT and cache.add(
+            lock_key, True, timeout=lock_timeout
+        ):
+            start_refresh(city, lock_key)
+        return weather
+
+    if cache.add(lock_key, True, timeout=lock_timeout):
+        try:
+            return _refresh_locked(city, lock_key)
+        except (requests.RequestException, KeyError, ValueError) as exc:
+            raise WeatherUnavailable(str(exc)) from exc
+
+    deadline = time.monotonic() + settings.WEATHER_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        weather = cache.get(key)
+        if weather is not None:
+            return weather
+    raise WeatherUnavailable(f"no weather for {city} yet")
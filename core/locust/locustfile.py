@@ -39,3 +39,62 @@ class RandomTestUser(HttpUser):
     #     for item_id in range(10):
     #         self.client.get(f"/item?id={item_id}", name="/item")
     #         time.sleep(1)
+
+
+class TaskApiUser(HttpUser):
+    """
+    a logged in client of the task api creating a task now and then,
+    the polling users below compare plain and conditional polling:
+    compare the "Average size" and the server CPU of both
+
+        locust -f locustfile.py PollingUser ConditionalPollingUser
+    """
+
+    abstract = True
+
+    def on_start(self):
+        response = self.client.post(
+            url="/accounts/api/v1/jwt/create/",
+            data={"email": "admin@admin.com", "password": "a/1234567"},
+        ).json()
+        self.client.headers = {
+            "Authorization": f"Bearer {response.get('access', None)}"
+        }
+
+    @task(1)
+    def create_task(self):
+        data = {"content": "content from locust", "is_done": False}
+        self.client.post("/api/v1/task/", data=data)
+
+
+class PollingUser(TaskApiUser):
+    """
+    a mobile client polling the task list, downloading it every time
+    """
+
+    @task(10)
+    def poll_tasks(self):
+        self.client.get("/api/v1/task/", name="poll /api/v1/task/")
+
+
+class ConditionalPollingUser(TaskApiUser):
+    """
+    the same client sending the ETag of its last response, unchanged
+    lists come back as an empty 304
+    """
+
+    etag = None
+
+    @task(10)
+    def poll_tasks(self):
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+        with self.client.get(
+            "/api/v1/task/",
+            headers=headers,
+            name="conditional poll /api/v1/task/",
+            catch_response=True,
+        ) as response:
+            if response.status_code == 304:
+                response.success()
+            elif response.status_code == 200:
+                self.etag = response.headers.get("ETag")
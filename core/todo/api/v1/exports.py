@@ -0,0 +1,52 @@
+import csv
+
+from rest_framework import serializers
+from core.renderers import FastJSONRenderer
+
+# columns of an exported task, in order
+EXPORT_FIELDS = ["id", "content", "is_done", "created_date", "updated_date"]
+
+
+class Echo:
+    """
+    file-like object that returns what is written, for csv.writer
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(rows):
+    """
+    the exported rows (values_list tuples of EXPORT_FIELDS) with the
+    dates formatted like the api
+    """
+    date = serializers.DateTimeField().to_representation
+    for pk, content, is_done, created, updated in rows:
+        yield pk, content, is_done, date(created), date(updated)
+
+
+def export_ndjson(rows):
+    """
+    one json object per line
+    """
+    render = FastJSONRenderer().render
+    for row in export_rows(rows):
+        yield render(dict(zip(EXPORT_FIELDS, row))) + b"\n"
+
+
+def export_csv(rows):
+    """
+    csv with a header line
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in export_rows(rows):
+        yield writer.writerow(row)
+
+
+# output name: (content type, file extension, row writer)
+EXPORT_OUTPUTS = {
+    "ndjson": ("application/x-ndjson", "ndjson", export_ndjson),
+    "csv": ("text/csv", "csv", export_csv),
+}
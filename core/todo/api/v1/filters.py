@@ -0,0 +1,18 @@
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+from todo.search import get_search_backend
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    SearchFilter using the full-text search backend of Task.content,
+    results are ordered by relevance unless an ordering is asked for.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not (terms := self.get_search_terms(request)):
+            return queryset
+        queryset = get_search_backend().search(queryset, terms)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by("-search_rank", "-created_date")
+        return queryset
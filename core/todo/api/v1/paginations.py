@@ -1,5 +1,24 @@
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    PageNumberPagination,
+    _positive_int,
+)
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from todo.utils import decode_cursor, encode_cursor, seek
+
+
+class CountedPaginator(Paginator):
+    """
+    django Paginator that can be given the number of objects
+    """
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            self.count = count
 
 
 class CustomPagination(PageNumberPagination):
@@ -7,6 +26,18 @@ class CustomPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 100
 
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        using view.get_pagination_count() if it has one for
+        the total instead of a COUNT(*) query
+        """
+        get_count = getattr(view, "get_pagination_count", None)
+        self.count = get_count() if get_count else None
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, queryset, page_size):
+        return CountedPaginator(queryset, page_size, count=self.count)
+
     def get_paginated_response(self, data):
         return Response(
             {
@@ -19,3 +50,81 @@ class CustomPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset pagination seeking on (created_date, id), so the cost of a page
+    does not depend on how deep it is and no COUNT(*) is needed.
+    """
+
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.descending = (
+            request.query_params.get(self.ordering_query_param)
+            != "created_date"
+        )
+        reverse, position = False, None
+        if cursor := request.query_params.get(self.cursor_query_param):
+            try:
+                reverse, created_date, pk = decode_cursor(cursor)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            position = (created_date, pk)
+
+        queryset = seek(queryset, position, self.descending, reverse)
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self._get_link(encode_cursor(self.page[-1]))
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self._get_link(encode_cursor(self.page[0], reverse=True))
+
+    def _get_link(self, cursor):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "links": {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                },
+                "results": data,
+            }
+        )
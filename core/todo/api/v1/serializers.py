@@ -1,4 +1,10 @@
-from todo.models import Task
+from operator import attrgetter
+
+from django.db import connection, models
+from django.urls import reverse
+from django.utils import timezone
+from todo.models import Task, TaskCounter, ArchivedTask
+from todo.cache import invalidate_task_cache
 from accounts.models import User
 from rest_framework import serializers
 
@@ -9,6 +15,95 @@ class CustomUserSerializer(serializers.ModelSerializer):
         fields = ["email", "id"]
 
 
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    list serializer of TaskSerializer that writes all items at once
+    and reads them without building the fields of each row
+    """
+
+    columns = [
+        "id",
+        "content",
+        "is_done",
+        "created_date",
+        "updated_date",
+        "author.email",
+        "author_id",
+    ]
+
+    def to_representation(self, data):
+        """
+        The same representation as TaskSerializer for every task, the
+        field set, the url prefix and the date field are looked up once
+        and the rows are read as tuples (values_list for querysets)
+        """
+        if isinstance(data, models.Manager):
+            data = data.all()
+        if isinstance(data, models.QuerySet):
+            rows = data.values_list(
+                *[column.replace(".", "__") for column in self.columns]
+            )
+        else:
+            rows = map(attrgetter(*self.columns), data)
+        request = self.context.get("request")
+        detail = request.parser_context.get("kwargs").get("pk")
+        date = self.child.fields["created_date"].to_representation
+        url = request.build_absolute_uri(reverse("todo:api-v1:task-list"))
+        representation = []
+        for pk, content, is_done, created, updated, email, user in rows:
+            rep = {"author": {"email": email, "id": user}, "id": pk}
+            if detail:
+                rep["content"] = content
+            else:
+                rep["snippet"] = content[:10]
+                rep["url"] = f"{url}{pk}"
+            rep["is_done"] = is_done
+            rep["created_date"] = date(created)
+            rep["updated_date"] = date(updated)
+            representation.append(rep)
+        return representation
+
+    def create(self, validated_data):
+        """
+        create all the new Tasks with bulk_create
+        """
+        author = self.context.get("request").user
+        tasks = [Task(author=author, **attrs) for attrs in validated_data]
+        if connection.features.can_return_rows_from_bulk_insert:
+            tasks = Task.objects.bulk_create(tasks)
+            TaskCounter.objects.adjust(
+                author.pk,
+                total=len(tasks),
+                done=sum(task.is_done for task in tasks),
+            )
+            invalidate_task_cache(author.pk)
+            return tasks
+        # without RETURNING support the new pks would be unknown
+        for task in tasks:
+            task.save()
+        return tasks
+
+    def update(self, instance, validated_data):
+        """
+        update the given list of Tasks (same order as data) with bulk_update
+        """
+        now = timezone.now()
+        fields = {"updated_date"}
+        done = 0
+        for task, attrs in zip(instance, validated_data):
+            done -= task.is_done
+            for attr, value in attrs.items():
+                setattr(task, attr, value)
+            done += task.is_done
+            task.updated_date = now
+            fields.update(attrs)
+        Task.objects.bulk_update(instance, fields)
+        user = self.context.get("request").user
+        TaskCounter.objects.adjust(user.pk, done=done)
+        invalidate_task_cache(user.pk)
+        return instance
+
+
 class TaskSerializer(serializers.ModelSerializer):
     author = CustomUserSerializer(read_only=True)
     snippet = serializers.ReadOnlyField(source="get_snippet")
@@ -26,6 +121,7 @@ class TaskSerializer(serializers.ModelSerializer):
             "created_date",
             "updated_date",
         ]
+        list_serializer_class = TaskListSerializer
 
     def create(self, validated_data):
         """
@@ -39,7 +135,7 @@ class TaskSerializer(serializers.ModelSerializer):
         Getting absolute url for task
         """
         request = self.context.get("request")
-        abs_url = obj.pk
+        abs_url = f"{reverse('todo:api-v1:task-list')}{obj.pk}"
         return request.build_absolute_uri(abs_url)
 
     def to_representation(self, instance):
@@ -54,3 +150,15 @@ class TaskSerializer(serializers.ModelSerializer):
         else:
             rep.pop("content", None)
         return rep
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedTask
+        fields = ["id", "content", "created_date", "done_date"]
+
+
+class TaskSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ["id", "content", "is_done", "created_date", "updated_date"]
@@ -3,6 +3,7 @@ from . import views
 
 router = DefaultRouter()
 router.register("task", views.TaskModelViewSet, basename="task")
+router.register("history", views.ArchivedTaskViewSet, basename="history")
 
 app_name = "api-v1"
 urlpatterns = router.urls
@@ -1,11 +1,49 @@
-from rest_framework import viewsets
+from functools import partial
+from hashlib import md5
+from rest_framework import viewsets, serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    APIException,
+    NotFound,
+    ValidationError,
+)
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from .paginations import CustomPagination
-from todo.models import Task
-from .serializers import TaskSerializer
+from rest_framework.filters import OrderingFilter
+from rest_framework.settings import api_settings
+from django_filters.widgets import BooleanWidget
+from django.conf import settings
+from django.db import transaction
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from .paginations import CustomPagination, TaskCursorPagination
+from todo.models import Task, TaskCounter, TaskTombstone, ArchivedTask
+from todo.utils import decode_sync_token, encode_sync_token, seek
+from todo.cache import (
+    get_request_signature,
+    get_response_key,
+    get_task_version,
+    get_cached_data,
+    set_cached_data,
+)
+from .serializers import (
+    TaskSerializer,
+    TaskSyncSerializer,
+    ArchivedTaskSerializer,
+)
 from .permissions import IsVerified
+from .filters import TaskSearchFilter
+from .exports import EXPORT_FIELDS, EXPORT_OUTPUTS
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Sync token expired, sync again without it."
+    default_code = "sync_token_expired"
 
 
 class TaskModelViewSet(viewsets.ModelViewSet):
@@ -15,11 +53,60 @@ class TaskModelViewSet(viewsets.ModelViewSet):
 
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsVerified]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, TaskSearchFilter, OrderingFilter]
     filterset_fields = ["is_done"]
     search_fields = ["content"]
     ordering_fields = ["created_date"]
     pagination_class = CustomPagination
+    cursor_pagination_class = TaskCursorPagination
+    bulk_max_items = 100
+    export_chunk_size = 2000
+    sync_page_size = 100
+    sync_max_page_size = 500
+    # queries per action (core.query_budget), the first request of a user
+    # also builds the task counter, the creating bulk action is left out
+    # as it saves row by row on databases without RETURNING, export counts
+    # the queries of its streamed body
+    query_budget = {
+        "list": 10,
+        "retrieve": 4,
+        "create": 6,
+        "update": 8,
+        "partial_update": 8,
+        "destroy": 6,
+        "stats": 9,
+        "bulk_update": 7,
+        "bulk_destroy": 10,
+        "export": 3,
+        "sync": 4,
+        "done": 5,
+        "undone": 5,
+        "mark_done": 5,
+    }
+
+    @property
+    def paginator(self):
+        """
+        The paginator instance associated with the view,
+        chosen per request by get_pagination_class.
+        """
+        if not hasattr(self, "_paginator"):
+            self._paginator = self.get_pagination_class()()
+        return self._paginator
+
+    def get_pagination_class(self):
+        """
+        Cursor (keyset) pagination is used when asked with
+        ?pagination=cursor, when a cursor is sent or when it is
+        the TASK_PAGINATION setting, otherwise page number pagination.
+        """
+        if getattr(self, "request", None) is None:
+            return self.pagination_class
+        params = self.request.query_params
+        mode = params.get("pagination", settings.TASK_PAGINATION)
+        if mode == "cursor" or "cursor" in params:
+            return self.cursor_pagination_class
+        return self.pagination_class
 
     def get_queryset(self):
         """
@@ -27,4 +114,348 @@ class TaskModelViewSet(viewsets.ModelViewSet):
         for the currently authenticated user.
         """
         user = self.request.user
-        return Task.objects.filter(author=user)
+        return Task.objects.filter(author=user).select_related("author")
+
+    def get_pagination_count(self):
+        """
+        Number of tasks of the list from the user's TaskCounter,
+        None when a search narrows the list and it has to be counted.
+        """
+        params = self.request.query_params
+        if params.get(api_settings.SEARCH_PARAM):
+            return None
+        counter = TaskCounter.objects.get_for_user(self.request.user)
+        is_done = BooleanWidget().value_from_datadict(params, {}, "is_done")
+        if is_done is None:
+            return counter.total
+        return counter.done if is_done else counter.open
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request, *args, **kwargs):
+        """
+        Number of total, done and open tasks of the user
+        """
+        counter = TaskCounter.objects.get_for_user(request.user)
+        return Response(
+            {
+                "total": counter.total,
+                "done": counter.done,
+                "open": counter.open,
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def done(self, request, *args, **kwargs):
+        """
+        Mark the task done with a single UPDATE
+        """
+        return self.set_task_done(True)
+
+    @action(detail=True, methods=["post"])
+    def undone(self, request, *args, **kwargs):
+        """
+        Mark the task not done with a single UPDATE
+        """
+        return self.set_task_done(False)
+
+    def set_task_done(self, is_done):
+        """
+        Setting is_done of the requested task, 404 if it is not the user's
+        """
+        try:
+            pk = int(self.kwargs["pk"])
+        except ValueError:
+            raise NotFound()
+        tasks = self.get_queryset().filter(pk=pk)
+        changed = tasks.set_done(self.request.user.pk, is_done)
+        if not changed and not tasks.exists():
+            raise NotFound()
+        return Response({"id": pk, "is_done": is_done, "updated": changed})
+
+    @action(detail=False, methods=["post"], url_path="mark-done")
+    def mark_done(self, request, *args, **kwargs):
+        """
+        Mark the tasks of a list of ids ({"ids": [...]}) or all the tasks
+        (no ids) done with a single UPDATE
+        """
+        if not isinstance(request.data, dict):
+            raise ValidationError({"detail": "Expected an object."})
+        tasks = self.get_queryset()
+        if "ids" in request.data:
+            ids = serializers.ListField(child=serializers.IntegerField())
+            tasks = tasks.filter(
+                id__in=ids.run_validation(request.data["ids"])
+            )
+        return Response({"updated": tasks.set_done(request.user.pk)})
+
+    @action(detail=False, methods=["get"])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream all the tasks of the user as ndjson (default) or csv
+        (?output=csv), filtered and ordered like the list
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_OUTPUTS:
+            raise serializers.ValidationError(
+                {"output": f"Choose one of {', '.join(EXPORT_OUTPUTS)}."}
+            )
+        content_type, extension, write = EXPORT_OUTPUTS[output]
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=self.export_chunk_size)
+        )
+        response = StreamingHttpResponse(
+            write(rows), content_type=content_type
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="tasks.{extension}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def sync(self, request, *args, **kwargs):
+        """
+        Tasks created or updated and ids of tasks deleted since the ?since
+        token of the previous sync, at most ?limit of each. Follow "next"
+        while "has_more", without a token all the tasks are sent.
+        """
+        limit = self.get_sync_limit()
+        now = timezone.now()
+        # rows are dated before their transaction commits, the ones of the
+        # last seconds may still be committing and are left for next sync
+        cutoff = now - timedelta(seconds=settings.TASK_SYNC_SAFETY_WINDOW)
+        since = request.query_params.get("since")
+        if since:
+            try:
+                task_position, tombstone_position = decode_sync_token(since)
+            except ValueError:
+                raise ValidationError({"since": "Invalid sync token."})
+            retention = timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+            if tombstone_position[0] < now - retention:
+                raise SyncTokenExpired()
+        else:
+            # deletions before the first sync do not matter to the client
+            epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+            task_position, tombstone_position = (epoch, 0), (cutoff, 0)
+
+        tasks = seek(
+            Task.objects.filter(author=request.user, updated_date__lt=cutoff),
+            task_position,
+            descending=False,
+            field="updated_date",
+        )
+        tasks = list(tasks[: limit + 1])
+        tombstones = seek(
+            TaskTombstone.objects.filter(
+                author=request.user, deleted_date__lt=cutoff
+            ),
+            tombstone_position,
+            descending=False,
+            field="deleted_date",
+        ).values_list("id", "task_id", "deleted_date")
+        tombstones = list(tombstones[: limit + 1])
+        has_more = len(tasks) > limit or len(tombstones) > limit
+        tasks, tombstones = tasks[:limit], tombstones[:limit]
+        # a page that is not full got everything before the cutoff, so the
+        # position moves to it (and the token does not expire while there
+        # are no deletions)
+        if len(tasks) < limit:
+            task_position = (cutoff, 0)
+        elif tasks:
+            task_position = (tasks[-1].updated_date, tasks[-1].pk)
+        if len(tombstones) < limit:
+            tombstone_position = (cutoff, 0)
+        elif tombstones:
+            tombstone_position = (tombstones[-1][2], tombstones[-1][0])
+        return Response(
+            {
+                "changed": TaskSyncSerializer(tasks, many=True).data,
+                "deleted": [row[1] for row in tombstones],
+                "next": encode_sync_token(task_position, tombstone_position),
+                "has_more": has_more,
+            }
+        )
+
+    def get_sync_limit(self):
+        """
+        number of tasks and tombstones of a sync page from ?limit
+        """
+        try:
+            limit = int(self.request.query_params["limit"])
+        except KeyError:
+            return self.sync_page_size
+        except ValueError:
+            raise ValidationError({"limit": "A valid integer is required."})
+        return max(1, min(limit, self.sync_max_page_size))
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            partial(self.get_cached_response, super().list),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            partial(self.get_cached_response, super().retrieve),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def update(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().update, request, *args, **kwargs
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().destroy, request, *args, **kwargs
+        )
+
+    def get_etag(self):
+        """
+        ETag of the requested task or list from the user's task cache
+        version and the request signature (todo.cache), so no query is
+        made. There is no Last-Modified: the version is per user and
+        changes within a second, and a 304 must not skip the lookup of
+        a missing task.
+        """
+        signature = "{}|{}|{}".format(
+            get_request_signature(self.request),
+            self.request.accepted_media_type,
+            get_task_version(self.request.user.pk),
+        )
+        return quote_etag(md5(signature.encode()).hexdigest())
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        """
+        304 for GET with a matching If-None-Match, 412 when If-Match fails
+        on updates, otherwise the response of the handler with its ETag
+        """
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if request.method != "GET" or response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        return response
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """
+        Serving the response data from the user's versioned task cache,
+        saving signals bump the version so stale data is never served.
+        """
+        if not settings.TASK_CACHE_TIMEOUT:
+            return handler(request, *args, **kwargs)
+        key = get_response_key(request)
+        if (data := get_cached_data(key)) is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_data(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def validate_bulk_payload(self, data):
+        """
+        Bulk payloads must be a non empty list of at most bulk_max_items
+        """
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError(
+                {"detail": "Expected a non empty list of items."}
+            )
+        if len(data) > self.bulk_max_items:
+            raise serializers.ValidationError(
+                {"detail": f"At most {self.bulk_max_items} items allowed."}
+            )
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create a list of tasks in one transaction
+        """
+        self.validate_bulk_payload(request.data)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Update a list of the user's tasks ({"id": ..., fields}) in one
+        transaction, nothing is written if any item is invalid
+        """
+        self.validate_bulk_payload(request.data)
+        # ids that are not plain ints (lists, bools, ...) are not found
+        ids = [
+            item.get("id") if isinstance(item, dict) else None
+            for item in request.data
+        ]
+        ids = [
+            pk if isinstance(pk, int) and not isinstance(pk, bool) else None
+            for pk in ids
+        ]
+        with transaction.atomic():
+            tasks = (
+                self.get_queryset()
+                .select_for_update(of=("self",))
+                .in_bulk([pk for pk in ids if pk is not None])
+            )
+            instances = [tasks.get(pk) for pk in ids]
+            serializer = self.get_serializer(
+                [task for task in instances if task is not None],
+                data=request.data,
+                many=True,
+                partial=True,
+            )
+            valid = serializer.is_valid()
+            errors = serializer.errors if not valid else [{}] * len(ids)
+            errors = [
+                {"id": ["Not found."], **error} if task is None else error
+                for task, error in zip(instances, errors)
+            ]
+            if any(errors):
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer.save()
+        return Response(serializer.data)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        """
+        Delete a list of the user's tasks by id with a single query
+        """
+        self.validate_bulk_payload(request.data)
+        ids = serializers.ListField(child=serializers.IntegerField())
+        ids = ids.run_validation(request.data)
+        with transaction.atomic():
+            tasks = self.get_queryset().filter(id__in=ids)
+            deleted = set(tasks.values_list("id", flat=True))
+            tasks.purge()
+        return Response(
+            [{"id": pk, "deleted": pk in deleted} for pk in ids],
+            status=status.HTTP_200_OK,
+        )
+
+
+class ArchivedTaskViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    A ReadOnlyModelViewSet for the history of archived (done) tasks.
+    """
+
+    serializer_class = ArchivedTaskSerializer
+    permission_classes = [IsAuthenticated, IsVerified]
+    pagination_class = CustomPagination
+    query_budget = {"list": 4, "retrieve": 3}
+
+    def get_queryset(self):
+        """
+        This view should return the archived tasks
+        of the currently authenticated user.
+        """
+        return ArchivedTask.objects.filter(author=self.request.user)
@@ -0,0 +1,101 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import urlencode
+
+VERSION_KEY = "todo:task:version:{}"
+RESPONSE_KEY = "todo:task:response:{}:{}:{}"
+HITS_KEY = "todo:task:cache:hits"
+MISSES_KEY = "todo:task:cache:misses"
+
+
+def _new_version():
+    # a missing version starts from the clock so it never matches
+    # responses cached under an evicted older version
+    return time.time_ns()
+
+
+def get_task_version(user_id):
+    """
+    getting the current version of the user's cached task responses
+    """
+    key = VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_task_version(user_id):
+    """
+    making every cached task response of the user stale
+    """
+    key = VERSION_KEY.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def invalidate_task_cache(user_id):
+    """
+    bumping the user's version once the current transaction commits,
+    so no response is cached from data that is about to change
+    """
+    transaction.on_commit(lambda: bump_task_version(user_id))
+
+
+def get_request_signature(request):
+    """
+    absolute url of the request with its query params sorted
+    """
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return "{}?{}".format(request.build_absolute_uri(request.path), query)
+
+
+def get_response_key(request):
+    """
+    cache key of a task response for the user, current version and query
+    """
+    return RESPONSE_KEY.format(
+        request.user.pk,
+        get_task_version(request.user.pk),
+        md5(get_request_signature(request).encode()).hexdigest(),
+    )
+
+
+def get_cached_data(key):
+    data = cache.get(key)
+    _count(HITS_KEY if data is not None else MISSES_KEY)
+    return data
+
+
+def set_cached_data(key, data):
+    cache.set(key, data, timeout=settings.TASK_CACHE_TIMEOUT)
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_cache_stats():
+    """
+    hit and miss counters of the task response cache
+    """
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {
+        "hits": stats.get(HITS_KEY, 0),
+        "misses": stats.get(MISSES_KEY, 0),
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -1,41 +1,184 @@
-from django.core.management.base import BaseCommand
+import csv
+import io
+from datetime import timedelta
+from random import Random
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
 from faker import Faker
-from random import choice
+from rest_framework.authtoken.models import Token
 
-from todo.models import Task
+from todo.models import Task, TaskCounter
+from todo.utils import manual_dates
 from accounts.models import User
 
 
 class Command(BaseCommand):
-    help = "Creating task for todo list (default: 5)"
-
-    def __init__(self, *args, **kwargs):
-        super(Command, self).__init__(*args, **kwargs)
-        self.fake = Faker()
+    help = (
+        "Creating tasks for todo list (default: 5 tasks for 1 user), "
+        "with --users, --batch-size and --copy for large datasets"
+    )
+    password = "a/1234567"
+    # sentences are picked from a pool, faker is too slow for millions
+    content_pool_size = 5000
 
     def add_arguments(self, parser):
 
         parser.add_argument(
-            "-n", "--number", type=int, help="number of tasks to create"
+            "-n", "--number", type=int, help="number of tasks per user"
+        )
+        parser.add_argument(
+            "-u",
+            "--users",
+            type=int,
+            default=1,
+            help="number of users to create (default: 1)",
+        )
+        parser.add_argument(
+            "--done-ratio",
+            type=float,
+            default=0.5,
+            help="share of the tasks that are done (default: 0.5)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=0,
+            help="spread created dates over the last days (default: 0)",
+        )
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="number of tasks inserted at once (default: 5000)",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="insert the tasks with COPY (postgresql only)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="random seed, the same seed creates the same data",
         )
 
     def handle(self, *args, **options):
         task_number = options["number"] or 5
+        batch_size = options["batch_size"]
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy needs a postgresql database")
+        if not 0 <= options["done_ratio"] <= 1:
+            raise CommandError("--done-ratio must be between 0 and 1")
 
-        user = User.objects.create_user(
-            email=self.fake.email(), password="a/1234567", is_verified=True
-        )
+        self.random = Random(options["seed"])
+        self.fake = Faker()
+        self.fake.seed_instance(options["seed"])
+        self.contents = [
+            self.fake.sentence() for _ in range(self.content_pool_size)
+        ]
+        self.now = timezone.now()
+        insert = self.copy_tasks if options["copy"] else self.insert_tasks
 
-        for _ in range(task_number):
-            task = Task.objects.create(
-                author=user,
-                content=self.fake.sentence(),
-                is_done=choice([True, False]),
-            )
-            task.save()
+        start = perf_counter()
+        users = self.create_users(options["users"])
+        created, batch = 0, []
+        for user in users:
+            for _ in range(task_number):
+                batch.append(
+                    self.make_task(
+                        user, options["done_ratio"], options["days"]
+                    )
+                )
+                if len(batch) >= batch_size:
+                    created += insert(batch)
+                    batch = []
+                    self.stdout.write(f"created {created} tasks")
+        if batch:
+            created += insert(batch)
+
+        user_ids = [user.pk for user in users]
+        while user_ids:
+            TaskCounter.objects.reconcile(user_ids[:1000])
+            user_ids = user_ids[1000:]
 
+        user_info = users[0] if len(users) == 1 else f"{len(users)} users"
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully create {task_number} tasks for user: {user}"
+                f"Successfully create {created} tasks for user: {user_info} "
+                f"in {perf_counter() - start:.1f}s"
+            )
+        )
+
+    def create_users(self, number):
+        """
+        creating verified users (with tokens) sharing one password hash
+        """
+        password = make_password(self.password)
+        emails = []
+        while len(emails) < number:
+            email = self.fake.unique.email()
+            if not User.objects.filter(email=email).exists():
+                emails.append(email)
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(email=email, password=password, is_verified=True)
+                    for email in emails
+                ],
+                batch_size=1000,
             )
+            users = list(User.objects.filter(email__in=emails))
+            Token.objects.bulk_create(
+                [Token(user=user, key=Token.generate_key()) for user in users],
+                batch_size=1000,
+            )
+        order = {email: i for i, email in enumerate(emails)}
+        users.sort(key=lambda user: order[user.email])
+        return users
+
+    def make_task(self, user, done_ratio, days):
+        created = self.now - timedelta(
+            seconds=self.random.randint(0, days * 24 * 3600)
         )
+        updated = created + (self.now - created) * self.random.random()
+        return Task(
+            author=user,
+            content=self.random.choice(self.contents),
+            is_done=self.random.random() < done_ratio,
+            created_date=created,
+            updated_date=updated,
+        )
+
+    def insert_tasks(self, tasks):
+        with manual_dates(Task, "created_date", "updated_date"):
+            Task.objects.bulk_create(tasks)
+        return len(tasks)
+
+    def copy_tasks(self, tasks):
+        """
+        inserting the tasks with postgresql COPY ... FROM STDIN
+        """
+        fields = ["author", "content", "is_done", "created_date"]
+        fields = [Task._meta.get_field(name) for name in fields]
+        fields.append(Task._meta.get_field("updated_date"))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for task in tasks:
+            writer.writerow([getattr(task, field.attname) for field in fields])
+        buffer.seek(0)
+        columns = ", ".join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+                    connection.ops.quote_name(Task._meta.db_table), columns
+                ),
+                buffer,
+            )
+        return len(tasks)
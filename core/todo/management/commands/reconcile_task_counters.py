@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from todo.models import TaskCounter
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Recounting the task counters of users to repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="number of users to recount at once (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        user_ids = User.objects.order_by("pk").values_list("pk", flat=True)
+        last_pk, checked, repaired = 0, 0, 0
+        while batch := list(user_ids.filter(pk__gt=last_pk)[:batch_size]):
+            repaired += TaskCounter.objects.reconcile(batch)
+            checked += len(batch)
+            last_pk = batch[-1]
+            self.stdout.write(f"checked {checked} users, repaired {repaired}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully checked {checked} users, repaired {repaired}"
+            )
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from todo.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Showing hit/miss counters of the task api response cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="reset the counters"
+        )
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit ratio: {ratio:.1%}"
+        )
+        if options["reset"]:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.15 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["author", "-created_date"],
+                name="todo_task_author_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["author", "is_done", "-created_date"],
+                name="todo_task_author_done_idx",
+            ),
+        ),
+    ]
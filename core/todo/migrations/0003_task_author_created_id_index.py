@@ -0,0 +1,24 @@
+# Generated by Django 3.2.15 on 2026-10-18 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0002_task_author_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="todo_task_author_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["author", "-created_date", "-id"],
+                name="todo_task_author_created_idx",
+            ),
+        ),
+    ]
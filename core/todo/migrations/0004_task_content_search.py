@@ -0,0 +1,77 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE todo_task ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED
+    """,
+    """
+    CREATE INDEX todo_task_search_vector_idx
+    ON todo_task USING gin (search_vector)
+    """,
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS todo_task_search_vector_idx",
+    "ALTER TABLE todo_task DROP COLUMN IF EXISTS search_vector",
+]
+
+# external content fts5 table kept in sync by triggers, sqlite table
+# rebuilds (AlterField on Task) drop the triggers, todo.search's
+# ensure_fts_triggers recreates them after every migrate
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE todo_task_fts
+    USING fts5(content, content='todo_task', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER todo_task_fts_insert AFTER INSERT ON todo_task BEGIN
+        INSERT INTO todo_task_fts(rowid, content)
+        VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER todo_task_fts_delete AFTER DELETE ON todo_task BEGIN
+        INSERT INTO todo_task_fts(todo_task_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER todo_task_fts_update AFTER UPDATE OF content
+    ON todo_task BEGIN
+        INSERT INTO todo_task_fts(todo_task_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO todo_task_fts(rowid, content)
+        VALUES (new.id, new.content);
+    END
+    """,
+    "INSERT INTO todo_task_fts(todo_task_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS todo_task_fts_insert",
+    "DROP TRIGGER IF EXISTS todo_task_fts_delete",
+    "DROP TRIGGER IF EXISTS todo_task_fts_update",
+    "DROP TABLE IF EXISTS todo_task_fts",
+]
+
+
+def run_vendor_sql(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgres, "sqlite": sqlite}
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0003_task_author_created_id_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_vendor_sql(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_vendor_sql(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.15 on 2026-10-18 07:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_alter_user_groups"),
+        ("todo", "0004_task_content_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_counter",
+                        serialize=False,
+                        to="accounts.user",
+                    ),
+                ),
+                ("total", models.IntegerField(default=0)),
+                ("done", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.15 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0005_taskcounter"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_done", True)),
+                fields=["id"],
+                name="todo_task_done_idx",
+            ),
+        ),
+    ]
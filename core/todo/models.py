@@ -1,10 +1,110 @@
-from django.db import models
+from collections import Counter
+from time import monotonic
+
+from django.db import models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from django.contrib.auth import get_user_model
+from todo.cache import invalidate_task_cache
 
 # getting the user model object
 User = get_user_model()
 
 
+class TaskQuerySet(models.QuerySet):
+    def purge(self, archive=False):
+        """
+        Deleting the tasks with a single DELETE and no per-row signals,
+        the counters and caches of the authors are updated once per author
+        and a tombstone is left for each task (for the sync api).
+        With archive the tasks are copied to ArchivedTask first.
+        Returns the number of deleted tasks.
+        """
+        fields = ["id", "author_id", "is_done"]
+        if archive:
+            fields += ["content", "created_date", "updated_date"]
+        with transaction.atomic(using=self.db):
+            rows = list(
+                self.select_for_update().order_by().values_list(*fields)
+            )
+            if not rows:
+                return 0
+            if archive:
+                ArchivedTask.objects.bulk_create(
+                    [
+                        ArchivedTask(
+                            id=row[0],
+                            author_id=row[1],
+                            content=row[3],
+                            created_date=row[4],
+                            done_date=row[5],
+                        )
+                        for row in rows
+                    ],
+                    ignore_conflicts=True,
+                )
+            deleted = Task.objects.filter(
+                id__in=[row[0] for row in rows]
+            )._raw_delete(self.db)
+            TaskTombstone.objects.bulk_create(
+                [
+                    TaskTombstone(task_id=row[0], author_id=row[1])
+                    for row in rows
+                ]
+            )
+            totals = Counter(row[1] for row in rows)
+            done = Counter(row[1] for row in rows if row[2])
+            for author_id, total in totals.items():
+                TaskCounter.objects.adjust(
+                    author_id, total=-total, done=-done[author_id]
+                )
+                invalidate_task_cache(author_id)
+            if deleted != len(rows):
+                TaskCounter.objects.reconcile(totals)
+        return deleted
+
+    def set_done(self, user_id, is_done=True):
+        """
+        Marking the user's tasks of the queryset done (or not done) with
+        a single conditional UPDATE, the counter and the cache of the user
+        are updated once. Returns the number of changed tasks.
+        """
+        with transaction.atomic(using=self.db):
+            changed = self.filter(
+                author_id=user_id, is_done=not is_done
+            ).update(is_done=is_done, updated_date=timezone.now())
+            if changed:
+                TaskCounter.objects.adjust(
+                    user_id, done=changed if is_done else -changed
+                )
+                invalidate_task_cache(user_id)
+        return changed
+
+    def purge_in_batches(self, batch_size, time_budget=None, archive=False):
+        """
+        Purging the tasks in primary key ranges of at most batch_size rows,
+        each batch in its own transaction so an interrupted run loses
+        nothing and the next one carries on. Stops after time_budget
+        seconds, returns the number of deleted tasks of each batch.
+        """
+        deadline = monotonic() + time_budget if time_budget else None
+        pks = self.order_by("pk").values_list("pk", flat=True)
+        batches, last_pk = [], 0
+        while deadline is None or monotonic() < deadline:
+            batch = list(pks.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            batches.append(
+                self.filter(pk__gte=batch[0], pk__lte=batch[-1]).purge(
+                    archive=archive
+                )
+            )
+            last_pk = batch[-1]
+        return batches
+
+
 class Task(models.Model):
     """
     this is a class for tasks in our todo app
@@ -16,11 +116,249 @@ class Task(models.Model):
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_date"]
+        indexes = [
+            # per-author list, newest first (list/edit/delete views),
+            # id is the tie breaker of the keyset (cursor) pagination
+            models.Index(
+                fields=["author", "-created_date", "-id"],
+                name="todo_task_author_created_idx",
+            ),
+            # per-author list filtered by is_done, newest first
+            models.Index(
+                fields=["author", "is_done", "-created_date"],
+                name="todo_task_author_done_idx",
+            ),
+            # per-author changes since a watermark for the sync api
+            models.Index(
+                fields=["author", "updated_date", "id"],
+                name="todo_task_author_updated_idx",
+            ),
+            # done tasks in pk order for the batched cleanup
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_done=True),
+                name="todo_task_done_idx",
+            ),
+        ]
 
     def __str__(self):
         return "{} - {}".format(self.author, self.content)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembering is_done as stored to count the done/undone changes
+        if "is_done" in field_names:
+            instance._loaded_is_done = instance.is_done
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Saving the task and its author's counter together. is_done is
+        first written with a conditional UPDATE, like set_done: only the
+        save that really flips the stored value changes the counter, even
+        when concurrent saves toggle the same task.
+        """
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            self._done_flipped = None
+            if self.pk is not None and (
+                update_fields is None or "is_done" in update_fields
+            ):
+                self._done_flipped = (
+                    Task.objects.filter(pk=self.pk)
+                    .exclude(is_done=self.is_done)
+                    .update(is_done=self.is_done)
+                )
+            super().save(*args, **kwargs)
+
     def get_snippet(self):
         return self.content[:10]
+
+
+class TaskCounterManager(models.Manager):
+    def adjust(self, user_id, total=0, done=0):
+        """
+        Adding to the user's counter, a missing counter is left to
+        get_for_user which builds it from the tasks table
+        """
+        self.filter(user_id=user_id).update(
+            total=F("total") + total, done=F("done") + done
+        )
+
+    def get_for_user(self, user):
+        try:
+            return self.get(user=user)
+        except self.model.DoesNotExist:
+            self.reconcile([user.pk])
+            return self.get(user=user)
+
+    def reconcile(self, user_ids):
+        """
+        Recounting the counters of the users from the tasks table,
+        returns the number of counters that were missing or wrong
+        """
+        user_ids = list(user_ids)
+        counts = (
+            Task.objects.filter(author_id__in=user_ids)
+            .order_by()
+            .values("author_id")
+            .annotate(
+                total=Count("id"), done=Count("id", filter=Q(is_done=True))
+            )
+        )
+        counts = {
+            row["author_id"]: (row["total"], row["done"]) for row in counts
+        }
+        with transaction.atomic(using=self.db):
+            counters = self.select_for_update().in_bulk(user_ids)
+            missing, wrong = [], []
+            for user_id in user_ids:
+                total, done = counts.get(user_id, (0, 0))
+                counter = counters.get(user_id)
+                if counter is None:
+                    missing.append(
+                        self.model(user_id=user_id, total=total, done=done)
+                    )
+                elif (counter.total, counter.done) != (total, done):
+                    counter.total, counter.done = total, done
+                    wrong.append(counter)
+            self.bulk_create(missing, ignore_conflicts=True)
+            self.bulk_update(wrong, ["total", "done"])
+        return len(missing) + len(wrong)
+
+
+class TaskCounter(models.Model):
+    """
+    number of tasks of each user, kept up to date on every task change
+    so the api does not have to COUNT(*) the tasks
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_counter",
+    )
+    total = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+
+    objects = TaskCounterManager()
+
+    def __str__(self):
+        return "{} - {}/{}".format(self.user_id, self.done, self.total)
+
+    @property
+    def open(self):
+        return self.total - self.done
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_author_task_cache(sender, instance, **kwargs):
+    """
+    a signal to make the author's cached task responses stale
+    """
+    invalidate_task_cache(instance.author_id)
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created=False, **kwargs):
+    """
+    a signal to update the author's task counter after saving a task
+    """
+    if created:
+        TaskCounter.objects.adjust(
+            instance.author_id, total=1, done=int(instance.is_done)
+        )
+    elif getattr(instance, "_done_flipped", None):
+        TaskCounter.objects.adjust(
+            instance.author_id, done=1 if instance.is_done else -1
+        )
+    instance._loaded_is_done = instance.is_done
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    """
+    a signal to update the author's task counter after deleting a task
+    """
+    is_done = getattr(instance, "_loaded_is_done", instance.is_done)
+    TaskCounter.objects.adjust(
+        instance.author_id, total=-1, done=-int(is_done)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, **kwargs):
+    """
+    a signal to leave a tombstone of the deleted task for the sync api
+    """
+    TaskTombstone.objects.create(
+        task_id=instance.pk, author_id=instance.author_id
+    )
+
+
+class TaskTombstone(models.Model):
+    """
+    a deleted (or archived) task, telling syncing clients to drop it,
+    kept for TASK_TOMBSTONE_RETENTION_DAYS
+    """
+
+    task_id = models.BigIntegerField()
+    # no constraint: tombstones of the tasks of a user being deleted are
+    # written while the user goes away
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="task_tombstones",
+        db_index=False,
+        db_constraint=False,
+    )
+    deleted_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["author", "deleted_date", "id"],
+                name="todo_tombstone_author_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return "{} - {}".format(self.author_id, self.task_id)
+
+
+class ArchivedTask(models.Model):
+    """
+    done tasks moved out of the task table after TASK_ARCHIVE_AFTER_DAYS,
+    keeping only what the history needs
+    """
+
+    # the id of the archived task
+    id = models.BigIntegerField(primary_key=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+        db_index=False,
+    )
+    content = models.CharField(max_length=255)
+    created_date = models.DateTimeField()
+    done_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-done_date"]
+        indexes = [
+            models.Index(
+                fields=["author", "-done_date", "-id"],
+                name="todo_archive_author_done_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return "{} - {}".format(self.author_id, self.content)
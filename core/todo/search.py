@@ -0,0 +1,161 @@
+import abc
+import re
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from todo.models import Task
+
+WORD_RE = re.compile(r"\w+")
+
+
+class BaseTaskSearchBackend(abc.ABC):
+    """
+    Base class of the search backends of Task.content,
+    search() filters the tasks and annotates search_rank (higher is better)
+    """
+
+    def get_words(self, terms):
+        return [word for term in terms for word in WORD_RE.findall(term)]
+
+    @abc.abstractmethod
+    def search(self, queryset, terms):
+        """
+        the tasks of queryset matching every term, with search_rank
+        """
+
+
+class IlikeTaskSearchBackend(BaseTaskSearchBackend):
+    """
+    Substring search with ILIKE, scans every task of the user
+    """
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(content__icontains=term)
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class PostgresTaskSearchBackend(BaseTaskSearchBackend):
+    """
+    Full-text search on the generated todo_task.search_vector tsvector
+    column and its GIN index, every word is matched as a prefix
+    """
+
+    def search(self, queryset, terms):
+        if not (words := self.get_words(terms)):
+            return queryset.none()
+        query = " & ".join(f"{word}:*" for word in words)
+        vector = "{}.search_vector".format(
+            connection.ops.quote_name(Task._meta.db_table)
+        )
+        tsquery = "to_tsquery('simple', %s)"
+        return queryset.filter(
+            RawSQL(
+                f"{vector} @@ {tsquery}", [query], output_field=BooleanField()
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({vector}, {tsquery})",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+
+
+class SQLiteTaskSearchBackend(BaseTaskSearchBackend):
+    """
+    Full-text search on the todo_task_fts FTS5 table (dev and tests),
+    every word is matched as a prefix
+    """
+
+    fts_table = "todo_task_fts"
+    # the triggers keeping todo_task_fts in sync with todo_task
+    fts_triggers = {
+        "todo_task_fts_insert": """
+            AFTER INSERT ON todo_task BEGIN
+                INSERT INTO todo_task_fts(rowid, content)
+                VALUES (new.id, new.content);
+            END
+        """,
+        "todo_task_fts_delete": """
+            AFTER DELETE ON todo_task BEGIN
+                INSERT INTO todo_task_fts(todo_task_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+            END
+        """,
+        "todo_task_fts_update": """
+            AFTER UPDATE OF content ON todo_task BEGIN
+                INSERT INTO todo_task_fts(todo_task_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+                INSERT INTO todo_task_fts(rowid, content)
+                VALUES (new.id, new.content);
+            END
+        """,
+    }
+
+    def search(self, queryset, terms):
+        if not (words := self.get_words(terms)):
+            return queryset.none()
+        query = " ".join(f'"{word}"*' for word in words)
+        table = connection.ops.quote_name(Task._meta.db_table)
+        # a join lets sqlite drive the query from the fts index,
+        # fts5 rank is bm25 where lower is better
+        return queryset.extra(
+            tables=[self.fts_table],
+            where=[
+                f"{self.fts_table}.rowid = {table}.id",
+                f"{self.fts_table} MATCH %s",
+            ],
+            params=[query],
+            select={"search_rank": f"-{self.fts_table}.rank"},
+        )
+
+
+def ensure_fts_triggers(using="default", **kwargs):
+    """
+    post_migrate handler recreating the fts5 triggers of sqlite, a table
+    rebuild of todo_task (AlterField on Task) drops them. The fts table
+    is rebuilt when a trigger was missing since it missed the changes.
+    """
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return
+    fts_table = SQLiteTaskSearchBackend.fts_table
+    triggers = SQLiteTaskSearchBackend.fts_triggers
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE (type = 'table' AND name = %s) OR type = 'trigger'",
+            [fts_table],
+        )
+        existing = cursor.fetchall()
+        if ("table", fts_table) not in existing:
+            return
+        missing = set(triggers) - {name for _, name in existing}
+        for name in sorted(missing):
+            cursor.execute(f"CREATE TRIGGER {name} {triggers[name]}")
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"
+            )
+
+
+BACKENDS = {
+    "postgresql": PostgresTaskSearchBackend,
+    "sqlite": SQLiteTaskSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    the TASK_SEARCH_BACKEND setting or the backend of the database vendor
+    """
+    if path := settings.TASK_SEARCH_BACKEND:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, IlikeTaskSearchBackend)()
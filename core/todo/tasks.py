@@ -1,20 +1,81 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.utils.log import get_task_logger
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
 
-from todo.models import Task
+from todo.models import Task, TaskTombstone
 
 
 app = Celery()
+logger = get_task_logger(__name__)
 
 
 @app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
-    sender.add_periodic_task(crontab(minute="*/10"), custom_delete_task.s())
+    if settings.TASK_DONE_POLICY == "archive":
+        sender.add_periodic_task(
+            crontab(minute="*/10"), archive_done_tasks.s()
+        )
+    else:
+        sender.add_periodic_task(
+            crontab(minute="*/10"), custom_delete_task.s()
+        )
+    sender.add_periodic_task(
+        crontab(minute=0, hour=3), purge_task_tombstones.s()
+    )
 
 
 @app.task
-def custom_delete_task():
-    if tasks := Task.objects.filter(is_done=True):
-        tasks.delete()
-        print("deleted successfully")
-    print("there is no task to delete")
+def custom_delete_task(batch_size=None, time_budget=None):
+    """
+    deleting the done tasks in batches within a time budget,
+    returns the number of deleted tasks of each batch
+    """
+    batches = Task.objects.filter(is_done=True).purge_in_batches(
+        batch_size or settings.TASK_CLEANUP_BATCH_SIZE,
+        time_budget or settings.TASK_CLEANUP_TIME_BUDGET,
+    )
+    for number, deleted in enumerate(batches, start=1):
+        logger.info("batch %s: deleted %s done tasks", number, deleted)
+    if batches:
+        logger.info("deleted %s done tasks successfully", sum(batches))
+    else:
+        logger.info("there is no task to delete")
+    return batches
+
+
+@app.task
+def archive_done_tasks(batch_size=None, time_budget=None):
+    """
+    moving the tasks done more than TASK_ARCHIVE_AFTER_DAYS ago to the
+    archive in batches within a time budget,
+    returns the number of archived tasks of each batch
+    """
+    cutoff = timezone.now() - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+    batches = Task.objects.filter(
+        is_done=True, updated_date__lt=cutoff
+    ).purge_in_batches(
+        batch_size or settings.TASK_CLEANUP_BATCH_SIZE,
+        time_budget or settings.TASK_CLEANUP_TIME_BUDGET,
+        archive=True,
+    )
+    for number, archived in enumerate(batches, start=1):
+        logger.info("batch %s: archived %s done tasks", number, archived)
+    logger.info("archived %s done tasks", sum(batches))
+    return batches
+
+
+@app.task
+def purge_task_tombstones():
+    """
+    deleting the tombstones older than TASK_TOMBSTONE_RETENTION_DAYS,
+    returns the number of deleted tombstones
+    """
+    cutoff = timezone.now() - timedelta(
+        days=settings.TASK_TOMBSTONE_RETENTION_DAYS
+    )
+    deleted, _ = TaskTombstone.objects.filter(deleted_date__lt=cutoff).delete()
+    logger.info("deleted %s task tombstones", deleted)
+    return deleted
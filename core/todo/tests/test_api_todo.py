@@ -1,8 +1,26 @@
+import csv
+import io
+import json
 import pytest
+import time
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APIClient
-from todo.models import Task
+from todo.models import Task, TaskCounter, ArchivedTask
+from todo.api.v1.views import TaskModelViewSet
+from todo.cache import get_cache_stats
+from todo.search import SQLiteTaskSearchBackend, ensure_fts_triggers
+from todo.tasks import custom_delete_task
+from todo.utils import decode_sync_token, encode_sync_token
 from accounts.models import User
+from core.query_budget import query_budget, QueryBudgetExceeded
 
 
 @pytest.fixture
@@ -97,3 +115,564 @@ class TestTodoApi:
         task_url = f"{self.endpoint}{task.id}/"
         response = client.delete(path=task_url)
         assert response.status_code == 204
+
+    def test_api_todo_get_task_list_cursor_pagination(self, api_client):
+        client = api_client()
+        author = self.create_user_obj()
+        tasks = [
+            Task.objects.create(author=author, content=f"content {i}")
+            for i in range(7)
+        ]
+        client.force_authenticate(user=author)
+        response = client.get(
+            self.endpoint, {"pagination": "cursor", "page_size": 3}
+        )
+        assert response.status_code == 200
+        assert "total tasks" not in response.data
+        assert response.data["links"]["previous"] is None
+        first_page = [task["id"] for task in response.data["results"]]
+        seen = list(first_page)
+        while next_link := response.data["links"]["next"]:
+            response = client.get(next_link)
+            seen += [task["id"] for task in response.data["results"]]
+        assert seen == [task.id for task in reversed(tasks)]
+
+        response = client.get(
+            self.endpoint, {"page_size": 3, "pagination": "cursor"}
+        )
+        response = client.get(response.data["links"]["next"])
+        response = client.get(response.data["links"]["previous"])
+        assert [task["id"] for task in response.data["results"]] == first_page
+
+    def test_api_todo_get_task_list_invalid_cursor_404(self, api_client):
+        client = api_client()
+        user = self.create_user_obj()
+        client.force_authenticate(user=user)
+        response = client.get(self.endpoint, {"cursor": "invalid"})
+        assert response.status_code == 404
+        naive = urlsafe_b64encode(b"0|2020-01-01T00:00:00|1").decode()
+        response = client.get(self.endpoint, {"cursor": naive})
+        assert response.status_code == 404
+
+    def test_api_todo_bulk_create_response_201(self, api_client):
+        client = api_client()
+        author = self.create_user_obj()
+        client.force_authenticate(user=author)
+        data = [{"content": f"bulk {i}", "is_done": i % 2} for i in range(3)]
+        response = client.post(
+            f"{self.endpoint}bulk/", data=data, format="json"
+        )
+        assert response.status_code == 201
+        assert len(response.data) == 3
+        assert Task.objects.filter(author=author).count() == 3
+
+    def test_api_todo_bulk_create_response_400(self, api_client):
+        client = api_client()
+        author = self.create_user_obj()
+        client.force_authenticate(user=author)
+        data = [{"content": "valid"}, {"is_done": True}]
+        response = client.post(
+            f"{self.endpoint}bulk/", data=data, format="json"
+        )
+        assert response.status_code == 400
+        assert response.data[0] == {} and "content" in response.data[1]
+        assert not Task.objects.exists()
+
+    def test_api_todo_bulk_update_response_200(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        data = [{"id": task.id, "content": "bulk", "is_done": True}]
+        response = client.patch(
+            f"{self.endpoint}bulk/", data=data, format="json"
+        )
+        assert response.status_code == 200
+        task.refresh_from_db()
+        assert task.content == "bulk" and task.is_done
+
+    def test_api_todo_bulk_update_other_users_task_400(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        user = self.create_user_obj(2)
+        own_task = Task.objects.create(author=user, content="own")
+        client.force_authenticate(user=user)
+        data = [
+            {"id": own_task.id, "content": "changed"},
+            {"id": task.id, "content": "changed"},
+        ]
+        response = client.patch(
+            f"{self.endpoint}bulk/", data=data, format="json"
+        )
+        assert response.status_code == 400
+        assert response.data[0] == {} and "id" in response.data[1]
+        own_task.refresh_from_db()
+        assert own_task.content == "own"
+
+    def test_api_todo_bulk_update_invalid_ids_400(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        data = [
+            {"id": [task.id], "content": "changed"},
+            {"id": True, "content": "changed"},
+            {"id": task.id, "content": "changed"},
+        ]
+        response = client.patch(
+            f"{self.endpoint}bulk/", data=data, format="json"
+        )
+        assert response.status_code == 400
+        assert [error.get("id") for error in response.data] == [
+            ["Not found."],
+            ["Not found."],
+            None,
+        ]
+        task.refresh_from_db()
+        assert task.content == "content"
+
+    def test_api_todo_bulk_delete_response_200(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        other_task = Task.objects.create(
+            author=self.create_user_obj(2), content="content"
+        )
+        client.force_authenticate(user=author)
+        data = [task.id, other_task.id]
+        response = client.delete(
+            f"{self.endpoint}bulk/", data=data, format="json"
+        )
+        assert response.status_code == 200
+        assert response.data == [
+            {"id": task.id, "deleted": True},
+            {"id": other_task.id, "deleted": False},
+        ]
+        assert list(Task.objects.all()) == [other_task]
+
+    def test_api_todo_get_task_list_cached(
+        self, api_client, django_capture_on_commit_callbacks
+    ):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        response = client.get(self.endpoint)
+        assert response["X-Cache"] == "MISS"
+        response = client.get(self.endpoint)
+        assert response["X-Cache"] == "HIT"
+        assert response.data["total tasks"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Task.objects.create(author=author, content="content")
+        response = client.get(self.endpoint)
+        assert response["X-Cache"] == "MISS"
+        assert response.data["total tasks"] == 2
+        assert get_cache_stats() == {"hits": 1, "misses": 2}
+
+    def test_api_todo_get_task_list_search(self, api_client):
+        client = api_client()
+        author = self.create_user_obj()
+        Task.objects.create(author=author, content="buy milk")
+        Task.objects.create(author=author, content="walk the dog")
+        match = Task.objects.create(author=author, content="buy bread")
+        match.content = "buy dog food"
+        match.save()
+        client.force_authenticate(user=author)
+        response = client.get(self.endpoint, {"search": "do"})
+        assert response.status_code == 200
+        assert response.data["total tasks"] == 2
+        response = client.get(self.endpoint, {"search": "buy dog"})
+        assert [task["id"] for task in response.data["results"]] == [match.id]
+
+    def test_fts_triggers_recreated_after_migrate(self):
+        if connection.vendor != "sqlite":
+            pytest.skip("fts5 triggers are sqlite only")
+        author, task = self.create_author_and_task_obj()
+        triggers = set(SQLiteTaskSearchBackend.fts_triggers)
+
+        def existing():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                )
+                return {name for (name,) in cursor.fetchall()}
+
+        assert triggers <= existing()
+        # what a todo_task table rebuild leaves behind
+        with connection.cursor() as cursor:
+            for name in triggers:
+                cursor.execute(f"DROP TRIGGER {name}")
+        Task.objects.filter(pk=task.pk).update(content="walk the dog")
+        ensure_fts_triggers()
+        assert triggers <= existing()
+        search = SQLiteTaskSearchBackend().search
+        assert list(search(Task.objects.all(), ["dog"])) == [task]
+        assert not search(Task.objects.all(), ["content"]).exists()
+
+    def test_api_todo_get_task_stats_counters(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        stats_url = f"{self.endpoint}stats/"
+        assert client.get(stats_url).data == {"total": 1, "done": 0, "open": 1}
+
+        client.patch(f"{self.endpoint}{task.id}/", {"is_done": True})
+        client.post(self.endpoint, {"content": "content"})
+        data = [{"content": "bulk"}, {"content": "bulk", "is_done": True}]
+        client.post(f"{self.endpoint}bulk/", data=data, format="json")
+        assert client.get(stats_url).data == {"total": 4, "done": 2, "open": 2}
+
+        client.delete(f"{self.endpoint}{task.id}/")
+        ids = list(Task.objects.filter(is_done=True).values_list("id"))
+        client.delete(f"{self.endpoint}bulk/", data=ids[0], format="json")
+        assert client.get(stats_url).data == {"total": 2, "done": 0, "open": 2}
+        response = client.get(self.endpoint, {"is_done": "false"})
+        assert response.data["total tasks"] == 2
+
+    def test_task_counter_concurrent_saves(self):
+        author, task = self.create_author_and_task_obj()
+        TaskCounter.objects.get_for_user(author)
+        # two requests toggling the same task from stale copies
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(
+            pk=task.pk
+        )
+        first.is_done = second.is_done = True
+        first.save()
+        second.save()
+        assert TaskCounter.objects.get(user=author).done == 1
+        stale = Task.objects.get(pk=task.pk)
+        first.is_done = False
+        first.save()
+        stale.save()
+        counter = TaskCounter.objects.get(user=author)
+        assert (counter.total, counter.done) == (1, 1)
+
+    def test_reconcile_task_counters_command(self):
+        author, task = self.create_author_and_task_obj()
+        TaskCounter.objects.filter(user=author).update(total=10, done=5)
+        call_command("reconcile_task_counters", stdout=StringIO())
+        counter = TaskCounter.objects.get(user=author)
+        assert (counter.total, counter.done) == (1, 0)
+
+    def test_api_todo_get_history_list_response_200(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        user = self.create_user_obj(2)
+        for owner in [author, user]:
+            ArchivedTask.objects.create(
+                id=owner.id * 100,
+                author=owner,
+                content="archived",
+                created_date=task.created_date,
+                done_date=task.updated_date,
+            )
+        client.force_authenticate(user=author)
+        response = client.get(reverse("todo:api-v1:history-list"))
+        assert response.status_code == 200
+        assert [task["id"] for task in response.data["results"]] == [
+            author.id * 100
+        ]
+
+    def test_api_todo_get_task_list_queries_do_not_grow(
+        self, api_client, settings
+    ):
+        settings.TASK_CACHE_TIMEOUT = 0
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        client.get(self.endpoint)
+        with query_budget(None) as one_task:
+            client.get(self.endpoint)
+        for i in range(4):
+            Task.objects.create(author=author, content=f"content {i}")
+        with query_budget(None) as five_tasks:
+            response = client.get(self.endpoint)
+        assert len(response.data["results"]) == 5
+        assert one_task.count == five_tasks.count
+
+    def test_query_budget_exceeded(self, settings, caplog):
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(0):
+                User.objects.count()
+        settings.QUERY_BUDGET_RAISE = False
+        with query_budget(0, name="counting users"):
+            User.objects.count()
+        assert "counting users made 1 queries" in caplog.text
+
+    def test_api_todo_export_ndjson_filtered(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        done = Task.objects.create(author=author, content="done", is_done=True)
+        Task.objects.create(author=self.create_user_obj(2), content="other")
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-export")
+        response = client.get(url, {"is_done": "true"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [done.id]
+        response = client.get(url, {"ordering": "created_date"})
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(line)["content"] for line in lines] == [
+            "content",
+            "done",
+        ]
+
+    def test_api_todo_export_csv_search(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        Task.objects.create(author=author, content="buy milk")
+        client.force_authenticate(user=author)
+        response = client.get(
+            reverse("todo:api-v1:task-export"),
+            {"output": "csv", "search": "milk"},
+        )
+        assert response.status_code == 200
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        assert rows[0] == [
+            "id",
+            "content",
+            "is_done",
+            "created_date",
+            "updated_date",
+        ]
+        assert [row[1] for row in rows[1:]] == ["buy milk"]
+
+    def test_api_todo_export_stream_counted(self, api_client, monkeypatch):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        budget = {**TaskModelViewSet.query_budget, "export": 0}
+        monkeypatch.setattr(TaskModelViewSet, "query_budget", budget)
+        response = client.get(reverse("todo:api-v1:task-export"))
+        assert response.status_code == 200
+        with pytest.raises(QueryBudgetExceeded, match="made 1 queries"):
+            b"".join(response.streaming_content)
+
+    def test_api_todo_export_invalid_output(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        response = client.get(
+            reverse("todo:api-v1:task-export"), {"output": "xml"}
+        )
+        assert response.status_code == 400
+
+    def test_api_todo_get_task_list_not_modified(
+        self, api_client, django_capture_on_commit_callbacks
+    ):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        response = client.get(self.endpoint)
+        etag = response["ETag"]
+        response = client.get(self.endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        response = client.get(
+            self.endpoint, {"is_done": "true"}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        with django_capture_on_commit_callbacks(execute=True):
+            Task.objects.create(author=author, content="new")
+        response = client.get(self.endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        etag = response["ETag"]
+        # the validators come from the cache, a 304 runs no query
+        with CaptureQueriesContext(connection) as not_modified:
+            response = client.get(self.endpoint, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert len(not_modified) == 0
+
+    def test_api_todo_get_task_detail_not_modified(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        other = Task.objects.create(author=self.create_user_obj(2))
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-detail", kwargs={"pk": task.pk})
+        response = client.get(url)
+        assert "Last-Modified" not in response
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+        # If-Modified-Since is ignored, a missing task is still a 404
+        future = http_date(time.time() + 3600)
+        for pk in (other.pk, other.pk + 1):
+            url = reverse("todo:api-v1:task-detail", kwargs={"pk": pk})
+            response = client.get(url, HTTP_IF_MODIFIED_SINCE=future)
+            assert response.status_code == 404
+        response = client.get(url + "x")
+        assert response.status_code == 404
+
+    def test_api_todo_task_detail_invalid_pk_404(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        url = "/api/v1/task/abc/"
+        data = {"content": "changed", "is_done": True}
+        assert client.get(url).status_code == 404
+        assert client.put(url, data).status_code == 404
+        assert client.patch(url, data).status_code == 404
+        assert client.delete(url).status_code == 404
+
+    def test_api_todo_put_task_detail_if_match(
+        self, api_client, django_capture_on_commit_callbacks
+    ):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-detail", kwargs={"pk": task.pk})
+        etag = client.get(url)["ETag"]
+        data = {"content": "changed", "is_done": True}
+        response = client.put(url, data, HTTP_IF_MATCH='"stale"')
+        assert response.status_code == 412
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.put(url, data, HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        response = client.delete(url, HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+        assert Task.objects.filter(pk=task.pk).exists()
+
+    def test_api_todo_sync_changes_and_deletions(self, api_client, settings):
+        settings.TASK_SYNC_SAFETY_WINDOW = 0
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        other = Task.objects.create(author=author, content="other")
+        done = Task.objects.create(author=author, content="done", is_done=True)
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-sync")
+        response = client.get(url)
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data["changed"]] == [
+            task.id,
+            other.id,
+            done.id,
+        ]
+        assert response.data["deleted"] == []
+        token = response.data["next"]
+
+        task.content = "changed"
+        task.save()
+        client.delete(
+            reverse("todo:api-v1:task-detail", kwargs={"pk": other.pk})
+        )
+        custom_delete_task()
+        response = client.get(url, {"since": token})
+        assert [item["content"] for item in response.data["changed"]] == [
+            "changed"
+        ]
+        assert response.data["deleted"] == [other.id, done.id]
+        response = client.get(url, {"since": response.data["next"]})
+        assert response.data["changed"] == []
+        assert response.data["deleted"] == []
+
+    def test_api_todo_sync_html_delete(self, api_client, settings):
+        settings.TASK_SYNC_SAFETY_WINDOW = 0
+        author, task = self.create_author_and_task_obj()
+        client = api_client()
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-sync")
+        token = client.get(url).data["next"]
+        client.force_login(author)
+        client.post(reverse("todo:delete", kwargs={"pk": task.pk}))
+        assert client.get(url, {"since": token}).data["deleted"] == [task.id]
+
+    def test_api_todo_sync_limit_and_tokens(self, api_client, settings):
+        settings.TASK_SYNC_SAFETY_WINDOW = 0
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        for i in range(2):
+            Task.objects.create(author=author, content=f"content {i}")
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-sync")
+        response = client.get(url, {"limit": 2})
+        assert len(response.data["changed"]) == 2
+        assert response.data["has_more"]
+        response = client.get(
+            url, {"limit": 2, "since": response.data["next"]}
+        )
+        assert len(response.data["changed"]) == 1
+        assert not response.data["has_more"]
+        assert client.get(url, {"since": "bad"}).status_code == 400
+        naive = "2020-01-01T00:00:00|1|2020-01-01T00:00:00|1"
+        naive = urlsafe_b64encode(naive.encode()).decode()
+        assert client.get(url, {"since": naive}).status_code == 400
+        settings.TASK_TOMBSTONE_RETENTION_DAYS = 0
+        response = client.get(url, {"since": response.data["next"]})
+        assert response.status_code == 410
+
+    def test_api_todo_sync_safety_window(self, api_client, settings):
+        settings.TASK_SYNC_SAFETY_WINDOW = 60
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-sync")
+        response = client.get(url)
+        # the task may still be committing, it is left for a later sync
+        assert response.data["changed"] == []
+        task_position, _ = decode_sync_token(response.data["next"])
+        assert task_position[0] <= timezone.now() - timedelta(seconds=60)
+        Task.objects.filter(pk=task.pk).update(
+            updated_date=timezone.now() - timedelta(seconds=120)
+        )
+        response = client.get(url)
+        assert [item["id"] for item in response.data["changed"]] == [task.id]
+
+    def test_api_todo_sync_token_moves_without_deletions(
+        self, api_client, settings
+    ):
+        settings.TASK_SYNC_SAFETY_WINDOW = 0
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        url = reverse("todo:api-v1:task-sync")
+        old = timezone.now() - timedelta(days=29)
+        token = encode_sync_token((old, 0), (old, 0))
+        response = client.get(url, {"since": token})
+        assert response.data["deleted"] == []
+        _, tombstone_position = decode_sync_token(response.data["next"])
+        assert tombstone_position[0] > timezone.now() - timedelta(seconds=5)
+        settings.TASK_TOMBSTONE_RETENTION_DAYS = 1
+        response = client.get(url, {"since": response.data["next"]})
+        assert response.status_code == 200
+
+    def test_api_todo_task_done_and_undone(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        client.force_authenticate(user=author)
+        TaskCounter.objects.get_for_user(author)
+        url = reverse("todo:api-v1:task-done", kwargs={"pk": task.pk})
+        response = client.post(url)
+        assert response.data == {"id": task.pk, "is_done": True, "updated": 1}
+        assert client.post(url).data["updated"] == 0
+        counter = TaskCounter.objects.get_for_user(author)
+        assert (counter.total, counter.done) == (1, 1)
+        url = reverse("todo:api-v1:task-undone", kwargs={"pk": task.pk})
+        assert client.post(url).data["updated"] == 1
+        task.refresh_from_db()
+        assert not task.is_done
+
+        client.force_authenticate(user=self.create_user_obj(2))
+        assert client.post(url).status_code == 404
+
+    def test_api_todo_mark_done(self, api_client):
+        client = api_client()
+        author, task = self.create_author_and_task_obj()
+        tasks = [
+            Task.objects.create(author=author, content=f"content {i}")
+            for i in range(3)
+        ]
+        other = Task.objects.create(
+            author=self.create_user_obj(2), content="other"
+        )
+        client.force_authenticate(user=author)
+        TaskCounter.objects.get_for_user(author)
+        url = reverse("todo:api-v1:task-mark-done")
+        response = client.post(
+            url, {"ids": [tasks[0].pk, other.pk]}, format="json"
+        )
+        assert response.data == {"updated": 1}
+        assert client.post(url, {}, format="json").data == {"updated": 3}
+        assert client.post(url, [], format="json").status_code == 400
+        assert not Task.objects.filter(author=author, is_done=False).exists()
+        assert not Task.objects.get(pk=other.pk).is_done
+        response = client.get(reverse("todo:api-v1:task-stats"))
+        assert response.data == {"total": 4, "done": 4, "open": 0}
@@ -0,0 +1,60 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.authtoken.models import Token
+from todo.models import Task, TaskCounter
+from accounts.models import User
+
+
+@pytest.mark.django_db
+class TestTodoCommands:
+    def create_tasks(self, *args):
+        out = StringIO()
+        call_command("create_task", *args, stdout=out)
+        return out.getvalue()
+
+    def test_create_task_default(self):
+        output = self.create_tasks()
+        user = User.objects.get()
+        assert Task.objects.filter(author=user).count() == 5
+        assert user.is_verified and user.check_password("a/1234567")
+        assert Token.objects.filter(user=user).exists()
+        assert "Successfully create 5 tasks" in output
+
+    def test_create_task_many_users_in_batches(self):
+        self.create_tasks(
+            "-n",
+            "4",
+            "-u",
+            "3",
+            "--done-ratio",
+            "1",
+            "--days",
+            "30",
+            "-b",
+            "5",
+        )
+        assert User.objects.count() == 3
+        assert (
+            Task.objects.count()
+            == Task.objects.filter(is_done=True).count()
+            == 12
+        )
+        for counter in TaskCounter.objects.all():
+            assert (counter.total, counter.done) == (4, 4)
+        assert Task.objects.dates("created_date", "day").count() > 1
+
+    def test_create_task_seed_is_deterministic(self):
+        fields = ["content", "is_done"]
+        self.create_tasks("-n", "10", "--seed", "7", "--days", "5")
+        first = list(Task.objects.order_by("id").values_list(*fields))
+        Task.objects.all().delete()
+        User.objects.all().delete()
+        self.create_tasks("-n", "10", "--seed", "7", "--days", "5")
+        second = list(Task.objects.order_by("id").values_list(*fields))
+        assert first == second
+
+    def test_create_task_copy_needs_postgresql(self):
+        with pytest.raises(CommandError):
+            self.create_tasks("--copy")
@@ -0,0 +1,54 @@
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from todo.api.v1.serializers import TaskSerializer
+from todo.models import Task
+from accounts.models import User
+
+
+@pytest.mark.django_db
+class TestTaskSerializer:
+    def create_tasks(self, number=3):
+        author = User.objects.create_user(
+            email="test1@test.com", password="a/1234567", is_verified=True
+        )
+        for i in range(number):
+            Task.objects.create(
+                author=author, content=f"task content {i}", is_done=i % 2
+            )
+        return Task.objects.filter(author=author).select_related("author")
+
+    def render_both(self, data, path="/api/v1/task/", **kwargs):
+        request = Request(
+            APIRequestFactory().get(path),
+            parser_context={"kwargs": kwargs},
+        )
+        serializer = TaskSerializer(
+            data, many=True, context={"request": request}
+        )
+        generic = serializers.ListSerializer.to_representation(
+            serializer, data
+        )
+        fast = serializer.to_representation(data)
+        return JSONRenderer().render(generic), JSONRenderer().render(fast)
+
+    def test_list_representation_is_identical(self):
+        tasks = self.create_tasks()
+        generic, fast = self.render_both(list(tasks))
+        assert generic == fast
+        assert b'"url":"http://testserver/api/v1/task/' in fast
+
+    def test_list_representation_of_queryset_is_identical(self):
+        tasks = self.create_tasks()
+        generic, fast = self.render_both(tasks, "/api/v1/task/bulk/?a=b")
+        assert generic == fast
+        url = f'"url":"http://testserver/api/v1/task/{tasks[0].pk}"'
+        assert url.encode() in fast
+
+    def test_detail_representation_is_identical(self):
+        tasks = self.create_tasks(1)
+        generic, fast = self.render_both(list(tasks), pk=tasks[0].pk)
+        assert generic == fast
+        assert b'"content"' in fast and b'"url"' not in fast
@@ -0,0 +1,81 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from todo.models import Task, TaskCounter, TaskTombstone, ArchivedTask
+from todo.tasks import (
+    custom_delete_task,
+    archive_done_tasks,
+    purge_task_tombstones,
+)
+from accounts.models import User
+
+
+@pytest.mark.django_db
+class TestTodoTasks:
+    def create_user_obj(self, num=1):
+        return User.objects.create_user(
+            email=f"test{num}@test.com",
+            password="a/1234567",
+            is_verified=True,
+        )
+
+    def test_custom_delete_task_deletes_done_tasks_in_batches(self):
+        author = self.create_user_obj()
+        TaskCounter.objects.get_for_user(author)
+        for i in range(7):
+            Task.objects.create(author=author, content="done", is_done=True)
+        open_tasks = [
+            Task.objects.create(author=author, content="open")
+            for i in range(2)
+        ]
+        assert custom_delete_task(batch_size=3) == [3, 3, 1]
+        assert list(Task.objects.order_by("id")) == open_tasks
+        counter = TaskCounter.objects.get(user=author)
+        assert (counter.total, counter.done) == (2, 0)
+
+    def test_custom_delete_task_without_done_tasks(self):
+        author = self.create_user_obj()
+        Task.objects.create(author=author, content="open")
+        assert custom_delete_task() == []
+        assert Task.objects.count() == 1
+
+    def test_archive_done_tasks_moves_old_done_tasks(self):
+        author = self.create_user_obj()
+        old_done = Task.objects.create(author=author, content="old")
+        recent_done = Task.objects.create(author=author, content="recent")
+        old_open = Task.objects.create(author=author, content="open")
+        old_date = timezone.now() - timedelta(days=365)
+        Task.objects.filter(pk=old_done.pk).update(
+            is_done=True, updated_date=old_date
+        )
+        Task.objects.filter(pk=recent_done.pk).update(is_done=True)
+        Task.objects.filter(pk=old_open.pk).update(updated_date=old_date)
+
+        assert archive_done_tasks() == [1]
+        assert set(Task.objects.all()) == {recent_done, old_open}
+        archived = ArchivedTask.objects.get()
+        assert (archived.id, archived.author, archived.content) == (
+            old_done.id,
+            author,
+            "old",
+        )
+        assert archived.done_date == old_date
+
+    def test_purge_task_tombstones_keeps_recent_ones(self, settings):
+        author = self.create_user_obj()
+        old = Task.objects.create(author=author, content="old")
+        old_id = old.id
+        old.delete()
+        Task.objects.create(author=author, content="new").delete()
+        TaskTombstone.objects.filter(task_id=old_id).update(
+            deleted_date=timezone.now() - timedelta(days=31)
+        )
+        settings.TASK_TOMBSTONE_RETENTION_DAYS = 30
+        assert purge_task_tombstones() == 1
+        assert TaskTombstone.objects.count() == 1
+
+    def test_deleting_user_with_tasks(self):
+        author = self.create_user_obj()
+        Task.objects.create(author=author, content="content")
+        author.delete()
+        assert not Task.objects.exists()
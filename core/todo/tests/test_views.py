@@ -0,0 +1,95 @@
+import re
+import pytest
+from django.test import Client
+from django.urls import reverse
+from todo.models import Task
+from todo.views import TaskListView
+from accounts.models import User
+
+
+@pytest.mark.django_db
+class TestTodoViews:
+    endpoint = reverse("todo:index")
+
+    def create_client_and_tasks(self, number):
+        author = User.objects.create_user(
+            email="test1@test.com", password="a/1234567", is_verified=True
+        )
+        tasks = [
+            Task.objects.create(author=author, content=f"task {i}")
+            for i in range(number)
+        ]
+        client = Client()
+        client.force_login(author)
+        return client, tasks
+
+    def test_task_list_pages(self, monkeypatch):
+        monkeypatch.setattr(TaskListView, "paginate_by", 2)
+        client, tasks = self.create_client_and_tasks(3)
+        response = client.get(self.endpoint)
+        assert response.context["tasks"] == tasks[:0:-1]
+        assert response.context["previous_cursor"] is None
+        cursor = response.context["next_cursor"]
+        response = client.get(self.endpoint, {"cursor": cursor})
+        assert response.context["tasks"] == [tasks[0]]
+        assert response.context["next_cursor"] is None
+        cursor = response.context["previous_cursor"]
+        response = client.get(self.endpoint, {"cursor": cursor})
+        assert response.context["tasks"] == tasks[:0:-1]
+
+    def test_task_list_invalid_cursor(self):
+        client, tasks = self.create_client_and_tasks(1)
+        response = client.get(self.endpoint, {"cursor": "bad"})
+        assert response.status_code == 404
+
+    def test_task_list_cached_rows_follow_changes(self):
+        client, tasks = self.create_client_and_tasks(1)
+        done_url = reverse("todo:done", kwargs={"pk": tasks[0].pk})
+        assert done_url in client.get(self.endpoint).content.decode()
+        assert done_url in client.get(self.endpoint).content.decode()
+        client.post(done_url)
+        assert done_url not in client.get(self.endpoint).content.decode()
+
+    def test_task_list_cached_rows_renumbered(self):
+        client, tasks = self.create_client_and_tasks(1)
+        row = re.compile(rf'value="{tasks[0].pk}">\s*(\d+)')
+        assert row.findall(client.get(self.endpoint).content.decode()) == ["1"]
+        Task.objects.create(author=tasks[0].author, content="newer")
+        assert row.findall(client.get(self.endpoint).content.decode()) == ["2"]
+
+    def test_task_done_and_undone(self):
+        client, tasks = self.create_client_and_tasks(1)
+        client.post(reverse("todo:done", kwargs={"pk": tasks[0].pk}))
+        assert Task.objects.get(pk=tasks[0].pk).is_done
+        client.post(reverse("todo:undone", kwargs={"pk": tasks[0].pk}))
+        assert not Task.objects.get(pk=tasks[0].pk).is_done
+
+    def test_task_done_post_only_with_csrf(self):
+        client, tasks = self.create_client_and_tasks(1)
+        done_url = reverse("todo:done", kwargs={"pk": tasks[0].pk})
+        assert client.get(done_url).status_code == 405
+        client.handler.enforce_csrf_checks = True
+        assert client.post(done_url).status_code == 403
+        assert not Task.objects.get(pk=tasks[0].pk).is_done
+
+    def test_task_done_of_other_user_404(self):
+        client, tasks = self.create_client_and_tasks(1)
+        other = User.objects.create_user(email="test2@test.com", password="a")
+        task = Task.objects.create(author=other, content="other")
+        response = client.post(reverse("todo:done", kwargs={"pk": task.pk}))
+        assert response.status_code == 404
+        assert not Task.objects.get(pk=task.pk).is_done
+
+    def test_task_mark_selected_and_all_done(self):
+        client, tasks = self.create_client_and_tasks(3)
+        url = reverse("todo:done-selected")
+        response = client.post(url, {"ids": [tasks[0].pk]}, follow=True)
+        assert "1 task(s) marked as done" in response.content.decode()
+        assert list(
+            Task.objects.filter(is_done=True).values_list("id", flat=True)
+        ) == [tasks[0].pk]
+        response = client.post(url, {"ids": ["²", "x", tasks[1].pk]})
+        assert response.status_code == 302
+        assert Task.objects.get(pk=tasks[1].pk).is_done
+        client.post(url, {"all": "1"})
+        assert Task.objects.filter(is_done=False).count() == 0
@@ -7,7 +7,13 @@ app_name = "todo"
 urlpatterns = [
     path("", views.TaskListView.as_view(), name="index"),
     path("add/", views.TaskCreateView.as_view(), name="add"),
+    path("done/", views.TaskMarkDoneView.as_view(), name="done-selected"),
     path("<int:pk>/done/", views.TaskDoneUpdateView.as_view(), name="done"),
+    path(
+        "<int:pk>/undone/",
+        views.TaskDoneUpdateView.as_view(is_done=False),
+        name="undone",
+    ),
     path("<int:pk>/delete/", views.TaskDeleteView.as_view(), name="delete"),
     path("<int:pk>/edit/", views.TaskEditView.as_view(), name="edit"),
     path("api/v1/", include("todo.api.v1.urls")),
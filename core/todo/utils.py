@@ -0,0 +1,111 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from contextlib import contextmanager
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive
+
+
+def encode_cursor(task, reverse=False):
+    """
+    encoding the (created_date, id) position of task as an opaque cursor
+    """
+    raw = "{}|{}|{}".format(
+        int(reverse), task.created_date.isoformat(), task.pk
+    )
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    decoding a cursor made by encode_cursor,
+    returns (reverse, created_date, id) and raises ValueError if invalid
+    """
+    try:
+        raw = urlsafe_b64decode(cursor.encode()).decode()
+        reverse, created_date, pk = raw.split("|")
+        created_date = parse_datetime(created_date)
+        # naive dates can't be compared with the aware ones of the rows
+        if created_date is None or is_naive(created_date):
+            raise ValueError("invalid cursor date")
+        return bool(int(reverse)), created_date, int(pk)
+    except (BinasciiError, UnicodeError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def seek(
+    queryset,
+    position=None,
+    descending=True,
+    reverse=False,
+    field="created_date",
+):
+    """
+    keyset filtering and ordering of rows on (field, id),
+    rows after position in the given direction (before it if reverse)
+    """
+    newest_first = descending != reverse
+    if position is not None:
+        # the plain range condition lets the database seek in the index
+        value, pk = position
+        if newest_first:
+            queryset = queryset.filter(**{f"{field}__lte": value}).filter(
+                Q(**{f"{field}__lt": value}) | Q(id__lt=pk)
+            )
+        else:
+            queryset = queryset.filter(**{f"{field}__gte": value}).filter(
+                Q(**{f"{field}__gt": value}) | Q(id__gt=pk)
+            )
+    if newest_first:
+        return queryset.order_by(f"-{field}", "-id")
+    return queryset.order_by(field, "id")
+
+
+def encode_sync_token(task_position, tombstone_position):
+    """
+    encoding the (updated_date, id) position in the tasks and the
+    (deleted_date, id) position in the tombstones as an opaque token
+    """
+    raw = "|".join(
+        str(value) if isinstance(value, int) else value.isoformat()
+        for value in (*task_position, *tombstone_position)
+    )
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_sync_token(token):
+    """
+    decoding a token made by encode_sync_token, returns the task and the
+    tombstone positions and raises ValueError if invalid
+    """
+    try:
+        raw = urlsafe_b64decode(token.encode()).decode()
+        task_date, task_pk, tombstone_date, tombstone_pk = raw.split("|")
+        task_date = parse_datetime(task_date)
+        tombstone_date = parse_datetime(tombstone_date)
+        if any(
+            date is None or is_naive(date)
+            for date in (task_date, tombstone_date)
+        ):
+            raise ValueError("invalid token date")
+        return (task_date, int(task_pk)), (tombstone_date, int(tombstone_pk))
+    except (BinasciiError, UnicodeError, TypeError) as e:
+        raise ValueError("invalid token") from e
+
+
+@contextmanager
+def manual_dates(model, *field_names):
+    """
+    turning auto_now/auto_now_add of the fields off, so bulk inserts keep
+    the dates set on the objects (seeding and benchmarks)
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
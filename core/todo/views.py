@@ -1,24 +1,67 @@
+from django.views import View
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
+from django.http import Http404
 from .models import Task
+from .utils import decode_cursor, encode_cursor, seek
 from .forms import TaskForm
 
 
 class TaskListView(LoginRequiredMixin, ListView):
     """
     This is a view class that show the task created by each user that logged in
+    (newest first, a page at a time with keyset ?cursor= pagination)
     """
 
     allow_empty = True
     template_name = "todo/index.html"
     context_object_name = "tasks"
+    paginate_by = 50
+    cursor_kwarg = "cursor"
 
     def get_queryset(self):
         tasks = Task.objects.filter(author=self.request.user)
         return tasks
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        the page of tasks after (or before, going back) the cursor
+        """
+        reverse, position = False, None
+        if cursor := self.request.GET.get(self.cursor_kwarg):
+            try:
+                reverse, created_date, pk = decode_cursor(cursor)
+            except ValueError:
+                raise Http404("Invalid cursor")
+            position = (created_date, pk)
+        rows = list(seek(queryset, position, reverse=reverse)[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+        has_next = position is not None if reverse else has_more
+        has_previous = has_more if reverse else position is not None
+        self.next_cursor = (
+            encode_cursor(rows[-1]) if has_next and rows else None
+        )
+        self.previous_cursor = (
+            encode_cursor(rows[0], reverse=True)
+            if has_previous and rows
+            else None
+        )
+        return None, None, rows, has_next or has_previous
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+        context["previous_cursor"] = self.previous_cursor
+        context["fragment_timeout"] = settings.TASK_FRAGMENT_CACHE_TIMEOUT
+        return context
+
 
 class TaskCreateView(LoginRequiredMixin, CreateView):
     """
@@ -35,19 +78,45 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class TaskDoneUpdateView(LoginRequiredMixin, UpdateView):
+class TaskDoneUpdateView(LoginRequiredMixin, View):
     """
     This is a view that change the status (is_done) of task to True
+    (or to False with is_done=False) with a single UPDATE, POST only
     """
 
-    model = Task
-    template_name = reverse_lazy("todo:index")
+    is_done = True
+
+    def post(self, request, pk, *args, **kwargs):
+        tasks = Task.objects.filter(pk=pk)
+        if not tasks.set_done(request.user.pk, self.is_done):
+            get_object_or_404(tasks, author=request.user)
+        return redirect(reverse_lazy("todo:index"))
+
+
+class TaskMarkDoneView(LoginRequiredMixin, View):
+    """
+    This is a view that mark the selected tasks (ids) or all the tasks
+    (all) of the user done with a single UPDATE
+    """
 
-    def get(self, request, pk, *args, **kwargs):
-        task = get_object_or_404(Task, pk=pk)
-        if task.author == self.request.user:
-            task.is_done = True
-            task.save()
+    def get_ids(self):
+        """
+        the posted ids, dropping the ones that are not integers
+        """
+        ids = []
+        for pk in self.request.POST.getlist("ids"):
+            try:
+                ids.append(int(pk))
+            except ValueError:
+                pass
+        return ids
+
+    def post(self, request, *args, **kwargs):
+        tasks = Task.objects.all()
+        if not request.POST.get("all"):
+            tasks = tasks.filter(id__in=self.get_ids())
+        changed = tasks.set_done(request.user.pk)
+        messages.success(request, f"{changed} task(s) marked as done")
         return redirect(reverse_lazy("todo:index"))
 
 